@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# Validation and timing of the batched solver.
+#
+# Draws random parameter sets around the FrameModel defaults, solves them
+# all with one call to solve_batch and one by one with solve(), and
+# compares the displacements, reactions and section forces of every set.
+# Also reports the time of both. The two paths use different
+# factorizations (LU versus Cholesky), so they agree to rounding errors
+# amplified by the condition number of K, around 1e-12 for these sets.
+#
+#   python benchmarks/bench_batch.py [--n 500] [--seed 1] [--rtol 1e-10]
+#
+
+import sys, os, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from frame_model import FrameModel
+
+
+def main(argv=None):
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description="Validate and time FrameModel.solve_batch.")
+    parser.add_argument("--n", type=int, default=500, help="number of parameter sets")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rtol", type=float, default=1e-10)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    model = FrameModel()
+
+    # Geometry and sections within +-50 %, loads in both directions.
+
+    params = {}
+    for name in model.parameters:
+        value = getattr(model, name)
+        if name in model.stiffness_parameters:
+            params[name] = value * rng.uniform(0.5, 1.5, args.n)
+        else:
+            params[name] = rng.uniform(-2e4, 2e4, args.n)
+
+    t0 = time.perf_counter()
+    batch = model.solve_batch(**params)
+    t1 = time.perf_counter()
+
+    errors = {key: 0.0 for key in ("a", "r", "es")}
+
+    for k in range(args.n):
+        for name in model.parameters:
+            setattr(model, name, float(params[name][k]))
+        model.solve()
+
+        single = {"a": model.result.a[:, 0], "r": model.result.r[:, 0], "es": model.result.es}
+
+        # Deviation relative to the largest entry of each set.
+
+        for key, value in single.items():
+            scale = max(np.abs(value).max(), np.finfo(float).tiny)
+            errors[key] = max(errors[key], np.abs(batch[key][k] - value).max() / scale)
+
+    t2 = time.perf_counter()
+
+    print(f"parameter sets           {args.n:10d}")
+    print(f"solve_batch              {(t1 - t0) * 1000:10.1f} ms")
+    print(f"solve() loop             {(t2 - t1) * 1000:10.1f} ms")
+    for key, error in errors.items():
+        print(f"max rel. error {key:9s} {error:10.2e}")
+
+    if max(errors.values()) > args.rtol:
+        print("FAIL: solve_batch deviates from solve()")
+        return 1
+
+    print("OK: solve_batch matches solve() for every parameter set")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Import-time benchmark for the solver-only path of frame_model.
+#
+# Each measurement runs in a fresh interpreter so module caches do not
+# hide the cost. Reports the median wall time of importing frame_model
+# (and of solving once), and checks that no plotting or GUI modules were
+# loaded on the way. For reference the cost of additionally importing
+# calfem.vis_mpl is measured as well.
+#
+#   python benchmarks/bench_import.py [--repeat 7]
+#
+
+import sys, os, json, argparse, statistics, subprocess
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be loaded by the solver-only path.
+
+plotting_modules = ["matplotlib", "calfem.vis_mpl", "calfem.utils", "qtpy", "PyQt5", "PySide6"]
+
+probe = """
+import sys, time, json
+t0 = time.perf_counter()
+import frame_model
+t1 = time.perf_counter()
+frame_model.FrameModel().solve()
+t2 = time.perf_counter()
+if {extra!r}:
+    import calfem.vis_mpl
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import": t1 - t0,
+    "solve": t2 - t1,
+    "vis_mpl": t3 - t2,
+    "loaded": [m for m in {modules!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(extra=False):
+    """Runs the probe in a fresh interpreter and returns its timings."""
+
+    code = probe.format(extra=extra, modules=plotting_modules)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=base_dir, check=True,
+        capture_output=True, text=True).stdout
+
+    return json.loads(output)
+
+
+def main(argv=None):
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description="Measure frame_model import time.")
+    parser.add_argument("--repeat", type=int, default=7, help="number of runs (default: 7)")
+    args = parser.parse_args(argv)
+
+    runs = [measure() for i in range(args.repeat)]
+    runs_vis = [measure(extra=True) for i in range(args.repeat)]
+
+    import_time = statistics.median(run["import"] for run in runs)
+    solve_time = statistics.median(run["solve"] for run in runs)
+    vis_time = statistics.median(run["vis_mpl"] for run in runs_vis)
+    loaded = sorted(set().union(*(run["loaded"] for run in runs)))
+
+    print(f"import frame_model      {import_time * 1000:8.1f} ms")
+    print(f"first solve()           {solve_time * 1000:8.1f} ms")
+    print(f"import calfem.vis_mpl   {vis_time * 1000:8.1f} ms (deferred to first draw)")
+
+    if loaded:
+        print(f"FAIL: solver-only import loaded {', '.join(loaded)}")
+        return 1
+
+    print("OK: no plotting modules loaded by the solver-only path")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Validation and timing of the vectorised element kernel.
+#
+# Generates a frame, computes all element stiffness matrices and load
+# vectors with beam2e_batch and compares them element by element with
+# cfc.beam2e. Also reports the time of the per-element loop versus the
+# single vectorised call.
+#
+#   python benchmarks/bench_kernels.py [--storeys 50] [--bays 40]
+#
+
+import sys, os, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import calfem.core as cfc
+
+from frame_model import beam2e_batch
+from frame_generator import GeneratedFrame
+
+
+def main(argv=None):
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description="Validate and time beam2e_batch.")
+    parser.add_argument("--storeys", type=int, default=50)
+    parser.add_argument("--bays", type=int, default=40)
+    parser.add_argument("--rtol", type=float, default=1e-12)
+    args = parser.parse_args(argv)
+
+    frame = GeneratedFrame(args.storeys, args.bays)
+    frame.f = 1e3
+    frame.generate()
+
+    # Distributed loads on all elements to exercise both load terms.
+
+    frame.eq[:, 0] = 1.5e3
+
+    n_el = frame.edof.shape[0]
+
+    t0 = time.perf_counter()
+    Ke_loop = np.empty((n_el, 6, 6))
+    fe_loop = np.empty((n_el, 6))
+    for i in range(n_el):
+        Ke, fe = cfc.beam2e(frame.ex[i], frame.ey[i], frame.ep[i], frame.eq[i])
+        Ke_loop[i] = Ke
+        fe_loop[i] = fe.ravel()
+    t1 = time.perf_counter()
+    Ke_batch, fe_batch = beam2e_batch(frame.ex, frame.ey, frame.ep, frame.eq)
+    t2 = time.perf_counter()
+
+    # Element-wise relative deviation, scaled by each element's largest entry.
+
+    Ke_scale = np.abs(Ke_loop).max(axis=(1, 2))
+    fe_scale = np.maximum(np.abs(fe_loop).max(axis=1), np.finfo(float).tiny)
+    Ke_error = (np.abs(Ke_batch - Ke_loop).max(axis=(1, 2)) / Ke_scale).max()
+    fe_error = (np.abs(fe_batch - fe_loop).max(axis=1) / fe_scale).max()
+
+    print(f"elements                 {n_el:10d}")
+    print(f"cfc.beam2e loop          {(t1 - t0) * 1000:10.1f} ms")
+    print(f"beam2e_batch             {(t2 - t1) * 1000:10.1f} ms")
+    print(f"max rel. error Ke        {Ke_error:10.2e}")
+    print(f"max rel. error fe        {fe_error:10.2e}")
+
+    if Ke_error > args.rtol or fe_error > args.rtol:
+        print("FAIL: beam2e_batch deviates from cfc.beam2e")
+        return 1
+
+    print("OK: beam2e_batch matches cfc.beam2e element by element")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
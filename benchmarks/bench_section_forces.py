@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Validation and timing of the batched section force recovery.
+#
+# Generates and solves a frame, then computes the section forces, local
+# displacements and evaluation coordinates of all elements with
+# beam2s_batch and compares them element by element with cfc.beam2s.
+# Also reports the time of the per-element loop versus the single
+# vectorised call.
+#
+#   python benchmarks/bench_section_forces.py [--storeys 20] [--bays 20] [--nep 21]
+#
+
+import sys, os, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import calfem.core as cfc
+
+from frame_model import beam2s_batch
+from frame_generator import GeneratedFrame
+
+
+def main(argv=None):
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description="Validate and time beam2s_batch.")
+    parser.add_argument("--storeys", type=int, default=20)
+    parser.add_argument("--bays", type=int, default=20)
+    parser.add_argument("--nep", type=int, default=21)
+    parser.add_argument("--rtol", type=float, default=1e-12)
+    args = parser.parse_args(argv)
+
+    frame = GeneratedFrame(args.storeys, args.bays)
+    frame.f = 1e3
+    frame.solve()
+
+    # Axial loads on all elements to exercise both load terms.
+
+    eq = frame.eq.copy()
+    eq[:, 0] = 1.5e3
+
+    n_el = frame.edof.shape[0]
+
+    t0 = time.perf_counter()
+    loop = {"es": [], "edi": [], "ec": []}
+    for i in range(n_el):
+        es, edi, ec = cfc.beam2s(frame.ex[i], frame.ey[i], frame.ep[i], frame.ed[i], eq[i], args.nep)
+        loop["es"].append(es)
+        loop["edi"].append(edi)
+        loop["ec"].append(np.reshape(ec, (args.nep, 1)))
+    t1 = time.perf_counter()
+    es, edi, ec = beam2s_batch(frame.ex, frame.ey, frame.ep, frame.ed, eq, nep=args.nep)
+    t2 = time.perf_counter()
+
+    # Element-wise relative deviation, scaled by each element's largest entry.
+
+    errors = {}
+    for key, batch in (("es", es), ("edi", edi), ("ec", ec)):
+        reference = np.array(loop[key])
+        scale = np.maximum(np.abs(reference).max(axis=(1, 2)), np.finfo(float).tiny)
+        errors[key] = (np.abs(batch - reference).max(axis=(1, 2)) / scale).max()
+
+    print(f"elements                 {n_el:10d}")
+    print(f"evaluation points        {args.nep:10d}")
+    print(f"cfc.beam2s loop          {(t1 - t0) * 1000:10.1f} ms")
+    print(f"beam2s_batch             {(t2 - t1) * 1000:10.1f} ms")
+    for key, error in errors.items():
+        print(f"max rel. error {key:9s} {error:10.2e}")
+
+    if max(errors.values()) > args.rtol:
+        print("FAIL: beam2s_batch deviates from cfc.beam2s")
+        return 1
+
+    print("OK: beam2s_batch matches cfc.beam2s element by element")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# Validation and timing of the analytic design sensitivities.
+#
+# Compares FrameModel.sensitivities with central finite differences of
+# solve() for the displacements, reactions and section forces, for every
+# parameter, and reports the time of both. The deviation is measured on
+# normalised sensitivities (p / max|R|) dR/dp, so responses that do not
+# depend on a parameter (e.g. forces with respect to E) are handled the
+# same way as the others.
+#
+#   python benchmarks/bench_sensitivities.py [--step 1e-4] [--tol 1e-6]
+#
+
+import sys, os, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from frame_model import FrameModel
+
+
+def responses(model):
+    """Returns (a, r, es) of a solved model as flat arrays."""
+
+    result = model.result
+
+    return result.a[:, 0].copy(), result.r[:, 0].copy(), np.array(result.es)
+
+
+def main(argv=None):
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(description="Validate and time FrameModel.sensitivities.")
+    parser.add_argument("--step", type=float, default=1e-4, help="relative finite difference step")
+    parser.add_argument("--tol", type=float, default=1e-6,
+                        help="max deviation of normalised sensitivities")
+    args = parser.parse_args(argv)
+
+    model = FrameModel()
+    model.q1 = 2e3
+    model.q2 = -1e3
+    model.f1 = 5e3
+    model.solve()
+
+    base = responses(model)
+
+    t0 = time.perf_counter()
+    sens = model.sensitivities()
+    t1 = time.perf_counter()
+
+    fd = {key: [] for key in ("a", "r", "es")}
+
+    for name in model.parameters:
+        value = getattr(model, name)
+        h = args.step * abs(value) if value != 0 else args.step
+
+        solved = []
+        for sign in (1, -1):
+            perturbed = FrameModel()
+            for other in model.parameters:
+                setattr(perturbed, other, getattr(model, other))
+            setattr(perturbed, name, value + sign * h)
+            perturbed.solve()
+            solved.append(responses(perturbed))
+
+        for key, plus, minus in zip(fd, *solved):
+            fd[key].append((plus - minus) / (2 * h))
+
+    t2 = time.perf_counter()
+
+    print(f"sensitivities()          {(t1 - t0) * 1000:10.2f} ms")
+    print(f"finite differences       {(t2 - t1) * 1000:10.2f} ms ({2 * len(model.parameters)} solves)")
+    print()
+    print(f"{'parameter':10s} {'a':>10s} {'r':>10s} {'es':>10s}")
+
+    failed = False
+
+    for k, name in enumerate(sens["names"]):
+        value = abs(getattr(model, name)) or 1.0
+        errors = []
+
+        for key, response in zip(("a", "r", "es"), base):
+            analytic = sens[key][k]
+            numeric = fd[key][k]
+
+            error = np.abs(analytic - numeric).max() * value / np.abs(response).max()
+            errors.append(error)
+
+            failed = failed or error > args.tol
+
+        print(f"{name:10s} " + " ".join(f"{error:10.2e}" for error in errors))
+
+    print()
+
+    if failed:
+        print("FAIL: sensitivities deviate from finite differences")
+        return 1
+
+    print("OK: sensitivities match finite differences")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# Ahead-of-time build step for the GUI.
+#
+# Compiles frame_window.ui into the Python module frame_window_ui.py so
+# that FrameWindow does not have to parse the XML at startup, and
+# frame_window_res.qrc into a binary resource file frame_window_res.rcc
+# (registered at runtime with QResource.registerResource) plus the
+# Python fallback module frame_window_res.py. Run this after editing the
+# .ui or .qrc files:
+#
+#   python build.py
+#
+# The generated modules import Qt through qtpy. The UI module does not
+# import the resource module, resources are registered by
+# frame_window.py before the UI is set up. Requires PyQt5 (for pyuic5
+# and pyrcc5) at build time only.
+#
+
+import io, os, sys, ast, struct, subprocess
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_ui(ui_filename="frame_window.ui", py_filename="frame_window_ui.py"):
+    """Compiles a Qt Designer .ui file to a qtpy-based Python module."""
+
+    from PyQt5.uic import compileUi
+
+    output = io.StringIO()
+
+    with open(os.path.join(base_dir, ui_filename), "r", encoding="utf-8") as ui_file:
+        compileUi(ui_file, output, resource_suffix="_rc")
+
+    code = output.getvalue().replace(os.path.join(base_dir, ui_filename), ui_filename)
+    lines = []
+
+    for line in code.splitlines():
+        if line.startswith("from PyQt5 import"):
+            line = line.replace("from PyQt5 import", "from qtpy import")
+        if line.startswith("import ") and line.endswith("_rc"):
+            continue
+        lines.append(line)
+
+    with open(os.path.join(base_dir, py_filename), "w", encoding="utf-8") as py_file:
+        py_file.write("\n".join(lines).rstrip() + "\n")
+
+    print(f"{ui_filename} -> {py_filename}")
+
+
+def build_resources(qrc_filename="frame_window_res.qrc", py_filename="frame_window_res.py",
+                    rcc_filename="frame_window_res.rcc"):
+    """Compiles a .qrc file to a binary .rcc file and a fallback module.
+
+    pyrcc5 cannot write binary resources, so the .rcc file is assembled
+    from the data, name and tree blobs of the generated Python module.
+    The layout is the one written by Qt's rcc -binary (format version 2):
+    a 20 byte header ("qres", version, tree, data and names offsets)
+    followed by the data, names and tree blobs.
+    """
+
+    code = subprocess.run(
+        [sys.executable, "-m", "PyQt5.pyrcc_main", qrc_filename],
+        cwd=base_dir, check=True, capture_output=True, text=True).stdout
+
+    code = code.replace("from PyQt5 import QtCore", "from qtpy import QtCore")
+
+    with open(os.path.join(base_dir, py_filename), "w", encoding="utf-8") as py_file:
+        py_file.write(code)
+
+    print(f"{qrc_filename} -> {py_filename}")
+
+    blobs = {}
+
+    for node in ast.parse(code).body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            blobs[node.targets[0].id] = node.value.value
+
+    data = blobs["qt_resource_data"]
+    names = blobs["qt_resource_name"]
+    tree = blobs["qt_resource_struct_v2"]
+
+    header_size = 20
+    data_offset = header_size
+    names_offset = data_offset + len(data)
+    tree_offset = names_offset + len(names)
+
+    with open(os.path.join(base_dir, rcc_filename), "wb") as rcc_file:
+        rcc_file.write(b"qres")
+        rcc_file.write(struct.pack(">IIII", 2, tree_offset, data_offset, names_offset))
+        rcc_file.write(data)
+        rcc_file.write(names)
+        rcc_file.write(tree)
+
+    print(f"{qrc_filename} -> {rcc_filename}")
+
+
+if __name__ == "__main__":
+
+    build_ui()
+    build_resources()
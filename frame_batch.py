@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+#
+# Headless batch solver for the frame model.
+#
+# Reads many parameter sets from a CSV file (one column per parameter,
+# header row required) or a JSON Lines file (one object per line) and
+# solves them in chunks spread over a process pool. Each chunk is solved
+# with FrameModel.solve_batch. Parameters that are not given take the
+# FrameModel default values.
+#
+# The results are written to a compact .npz file containing:
+#
+#   parameters  (N, 11)     input parameters in FrameModel.parameters order
+#   a           (N, 12)     displacements
+#   r           (N, 12)     reactions
+#   es_max      (N, 3, 3)   max [N, Vy, Mz] along each beam
+#   es_min      (N, 3, 3)   min [N, Vy, Mz] along each beam
+#
+# If the output file ends in .frm the sweep is streamed instead: the
+# input is read in chunks, solved chunks are written into arrays
+# preallocated in a frame_model binary container, and memory use is
+# bounded by the chunk size. The container also holds a "completed"
+# counter, updated after each chunk has been written, so the rows
+# solved so far can be read with read_results even if the run was
+# interrupted. No plotting code is imported. Usage:
+#
+#   python frame_batch.py sweep.csv -o results.npz --workers 16
+#   python frame_model.py sweep.jsonl -o results.frm
+#
+
+import sys, os, csv, json, argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import frame_model as fm
+
+
+def _parameter_rows(filename):
+    """Yields the parameter sets of a CSV or JSON Lines file as dicts."""
+
+    if filename.endswith((".jsonl", ".ndjson")):
+        with open(filename, "r") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(filename, "r", newline="") as file:
+            yield from csv.DictReader(file)
+
+
+def _parameter_array(rows, defaults):
+    """Converts parameter dicts to an array in FrameModel.parameters order."""
+
+    names = fm.FrameModel.parameters
+
+    unknown = set().union(*rows) - set(names) if rows else set()
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+    params = np.empty((len(rows), len(names)))
+
+    for j, name in enumerate(names):
+        default = getattr(defaults, name)
+        params[:, j] = [float(row.get(name, default)) for row in rows]
+
+    return params
+
+
+def iter_parameters(filename, chunk_size=2000):
+    """Reads parameter sets from a CSV or JSON Lines file in chunks.
+
+    Yields (chunk_size, 11) arrays in FrameModel.parameters order (the
+    last chunk may be shorter), reading the file incrementally.
+    """
+
+    defaults = fm.FrameModel()
+    rows = []
+
+    for row in _parameter_rows(filename):
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield _parameter_array(rows, defaults)
+            rows = []
+
+    if rows:
+        yield _parameter_array(rows, defaults)
+
+
+def count_parameters(filename):
+    """Returns the number of parameter sets in a file."""
+
+    return sum(1 for row in _parameter_rows(filename))
+
+
+def read_parameters(filename):
+    """Reads parameter sets from a CSV or JSON Lines file.
+
+    Returns an (N, 11) array in FrameModel.parameters order.
+    """
+
+    chunks = list(iter_parameters(filename))
+
+    if not chunks:
+        return np.empty((0, len(fm.FrameModel.parameters)))
+
+    return np.concatenate(chunks)
+
+
+def solve_chunk(params, nep=21):
+    """Solves one chunk of parameter sets (runs in a worker process).
+
+    Returns (a, r, es_max, es_min) for the chunk.
+    """
+
+    model = fm.FrameModel()
+    results = model.solve_batch(nep=nep, **dict(zip(model.parameters, params.T)))
+
+    es = results["es"]
+
+    return results["a"], results["r"], es.max(axis=2), es.min(axis=2)
+
+
+def solve_chunks(chunks, workers=None, nep=21):
+    """Solves parameter chunks as they are produced.
+
+    chunks is any iterable of (n, 11) arrays. Yields (params, a, r,
+    es_max, es_min) per chunk, in input order. At most two chunks per
+    worker are in flight, so a long sweep is never held in memory.
+    """
+
+    if workers == 1:
+        for params in chunks:
+            yield (params,) + solve_chunk(params, nep)
+        return
+
+    workers = workers or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        for params in chunks:
+            pending.append((params, executor.submit(solve_chunk, params, nep)))
+
+            while len(pending) >= 2 * workers:
+                params, future = pending.popleft()
+                yield (params,) + future.result()
+
+        while pending:
+            params, future = pending.popleft()
+            yield (params,) + future.result()
+
+
+def solve_parameters(params, workers=None, chunk_size=2000, nep=21):
+    """Solves all parameter sets using a process pool.
+
+    Returns a dict with the arrays written by main().
+    """
+
+    n = params.shape[0]
+    chunks = [params[i:i + chunk_size] for i in range(0, n, chunk_size)]
+
+    results = {
+        "parameters": params,
+        "a": np.empty((n, 12)),
+        "r": np.empty((n, 12)),
+        "es_max": np.empty((n, 3, 3)),
+        "es_min": np.empty((n, 3, 3))
+    }
+
+    if len(chunks) <= 1:
+        workers = 1
+
+    start = 0
+    for chunk, a, r, es_max, es_min in solve_chunks(chunks, workers, nep):
+        stop = start + a.shape[0]
+        results["a"][start:stop] = a
+        results["r"][start:stop] = r
+        results["es_max"][start:stop] = es_max
+        results["es_min"][start:stop] = es_min
+        start = stop
+
+    return results
+
+
+def sweep_to_file(filename, chunks, n, workers=None, nep=21):
+    """Streams a sweep of n parameter sets into a binary container.
+
+    The output arrays are preallocated on disk and each solved chunk is
+    written and flushed before the "completed" counter is advanced.
+    Returns the number of parameter sets solved.
+    """
+
+    header = {"schema": "frame_batch", "parameter_names": list(fm.FrameModel.parameters),
+              "nep": nep}
+
+    table = fm.create_arrays(filename, {
+        "parameters": (float, (n, len(fm.FrameModel.parameters))),
+        "a": (float, (n, 12)),
+        "r": (float, (n, 12)),
+        "es_max": (float, (n, 3, 3)),
+        "es_min": (float, (n, 3, 3)),
+        "completed": (np.int64, (1,))
+    }, header)
+
+    names = ("parameters", "a", "r", "es_max", "es_min")
+
+    # Chunks are written with plain file writes rather than through a
+    # memory map, so the output does not accumulate in resident memory.
+
+    start = 0
+
+    with open(filename, "r+b") as file:
+        for values in solve_chunks(chunks, workers, nep):
+            stop = start + values[0].shape[0]
+            if stop > n:
+                raise ValueError(f"More than the {n} allocated parameter sets.")
+
+            for name, value in zip(names, values):
+                entry = table[name]
+                row_size = value[0].nbytes
+                file.seek(entry["offset"] + start * row_size)
+                file.write(np.ascontiguousarray(value, dtype=entry["dtype"]).tobytes())
+
+            file.flush()
+
+            file.seek(table["completed"]["offset"])
+            file.write(np.array([stop], dtype=table["completed"]["dtype"]).tobytes())
+            file.flush()
+
+            start = stop
+
+    return start
+
+
+def read_results(filename):
+    """Reads the results of a sweep written by sweep_to_file.
+
+    Returns a dict of read-only memory-mapped arrays, cut to the rows
+    that were completed (all of them unless the run was interrupted).
+    """
+
+    header, arrays = fm.read_arrays(filename)
+    completed = int(arrays.pop("completed")[0])
+
+    return {name: value[:completed] for name, value in arrays.items()}
+
+
+def main(argv=None):
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(
+        description="Solve many frame models from a CSV or JSON Lines file.")
+    parser.add_argument("input", help="CSV (with header) or JSON Lines parameter file")
+    parser.add_argument("-o", "--output", default="results.npz", help="output .npz or .frm file")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=2000,
+                        help="parameter sets per task (default: 2000)")
+    parser.add_argument("--nep", type=int, default=21,
+                        help="evaluation points per beam (default: 21)")
+    parser.add_argument("--compress", action="store_true", help="compress the output file")
+    args = parser.parse_args(argv)
+
+    if args.output.endswith(fm.BINARY_SUFFIX):
+        n = count_parameters(args.input)
+        chunks = iter_parameters(args.input, args.chunk_size)
+        solved = sweep_to_file(args.output, chunks, n, args.workers, args.nep)
+
+        print(f"Solved {solved} models, results written to {args.output}")
+
+        return 0
+
+    params = read_parameters(args.input)
+    results = solve_parameters(params, args.workers, args.chunk_size, args.nep)
+
+    if args.compress:
+        np.savez_compressed(args.output, **results)
+    else:
+        np.savez(args.output, **results)
+
+    print(f"Solved {params.shape[0]} models, results written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
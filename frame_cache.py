@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# Content-addressed on-disk cache of FrameModel results.
+#
+# Results are stored in the frame_model binary container format (the
+# same files FrameModel.save writes for .frm) under a key computed as a
+# SHA-256 hash of the canonical JSON of the input parameters, the solver
+# version and the number of evaluation points. A cached file can
+# therefore also be opened directly with FrameModel.load.
+#
+# Files are written to a temporary name and moved into place with
+# os.replace (see frame_model.replace_arrays), so concurrent processes
+# never see partial files. Hits
+# touch the file modification time, and when the cache grows beyond
+# max_bytes the least recently used files are removed, down to
+# evict_fraction of max_bytes. The cache size is tracked as files are
+# written, so the directory is only scanned when the budget is exceeded
+# or every rescan_interval puts (other processes may share the cache).
+# Temporary files left by killed writers are removed during the scan.
+# Results are read
+# into memory rather than memory-mapped, since mapped files cannot be
+# replaced or removed on Windows. Usage:
+#
+#   model = FrameModel()
+#   model.solve_cache = SolveCache("~/.cache/frame_model")
+#   model.solve()
+#
+# The GUI uses a cache in the directory given by the FRAME_CACHE_DIR
+# environment variable, if set.
+#
+
+import os, json, time, hashlib
+
+import frame_model as fm
+
+
+def cache_key(params, nep, solver_version=fm.SOLVER_VERSION):
+    """Returns the cache key of a parameter dict.
+
+    Values are converted to float and serialised with sorted keys, so
+    equal parameter sets give equal keys regardless of order or type.
+    """
+
+    canonical = json.dumps({
+        "parameters": {name: float(value) for name, value in sorted(params.items())},
+        "solver_version": solver_version,
+        "nep": int(nep)
+    }, sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def default_cache():
+    """Returns a cache in FRAME_CACHE_DIR, or None if it is not set."""
+
+    directory = os.environ.get("FRAME_CACHE_DIR")
+
+    return SolveCache(directory) if directory else None
+
+
+class SolveCache:
+
+    # Fraction of max_bytes kept after an eviction, number of puts
+    # between full scans and age in seconds of abandoned temporary files.
+
+    evict_fraction = 0.9
+    rescan_interval = 1000
+    stale_temp_age = 3600.0
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        """Opens (and creates if needed) a cache in directory."""
+
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        # Tracked total size, None until the first scan.
+
+        self._size = None
+        self._puts = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        """Returns the file name of a key."""
+
+        return os.path.join(self.directory, key[:2], key + fm.BINARY_SUFFIX)
+
+    def get(self, params, nep):
+        """Returns the cached FrameResult for params and nep, or None."""
+
+        key = cache_key(params, nep)
+        path = self.path(key)
+
+        try:
+            header, arrays = fm.read_arrays(path, mmap=False)
+            if header.get("key") != key:
+                raise ValueError(f"{path} does not hold key {key}.")
+            fm.check_model_header(header, path)
+            result = fm.FrameResult(header["nep"], arrays["result"])
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (ValueError, KeyError, OSError):
+
+            # Damaged or foreign file, drop it and solve again.
+
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return result
+
+    def put(self, params, result):
+        """Stores a FrameResult for params."""
+
+        key = cache_key(params, result.nep)
+        path = self.path(key)
+
+        header = {
+            "schema": "FrameModel",
+            "schema_version": fm.MODEL_SCHEMA_VERSION,
+            "parameters": {name: float(value) for name, value in params.items()},
+            "nep": result.nep,
+            "layout": result.layout(result.nep),
+            "key": key,
+            "solver_version": fm.SOLVER_VERSION
+        }
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            old_size = os.stat(path).st_size
+        except FileNotFoundError:
+            old_size = 0
+
+        new_size = fm.replace_arrays(path, {"result": result.buffer}, header)
+
+        self._puts += 1
+
+        if self._size is None or self._puts >= self.rescan_interval:
+            self.evict()
+        else:
+            self._size += new_size - old_size
+
+        if self._size > self.max_bytes:
+            self.evict(self.evict_fraction * self.max_bytes)
+
+    def _scan(self):
+        """Returns (mtime, size, path) of all cached and temporary files."""
+
+        entries = []
+        temps = []
+
+        for subdir in os.scandir(self.directory):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.name.endswith(fm.BINARY_SUFFIX):
+                    files = entries
+                elif entry.name.endswith(".tmp"):
+                    files = temps
+                else:
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        return entries, temps
+
+    def entries(self):
+        """Returns (mtime, size, path) of all cached files."""
+
+        return self._scan()[0]
+
+    def size(self):
+        """Returns the total size of the cached files in bytes."""
+
+        return sum(size for mtime, size, path in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Removes least recently used files until within max_bytes.
+
+        max_bytes defaults to self.max_bytes. Temporary files older than
+        stale_temp_age are removed as well.
+        """
+
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        entries, temps = self._scan()
+        entries.sort()
+        total = sum(size for mtime, size, path in entries)
+
+        for mtime, size, path in entries:
+            if total <= max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+        stale = time.time() - self.stale_temp_age
+        for mtime, size, path in temps:
+            if mtime < stale:
+                self._remove(path)
+
+        self._size = total
+        self._puts = 0
+
+    def clear(self):
+        """Removes all cached files."""
+
+        for mtime, size, path in self.entries():
+            self._remove(path)
+
+        self._size = 0
+
+    def _remove(self, path):
+        """Removes a file, ignoring files already removed by others.
+
+        Files that are open elsewhere cannot be removed on Windows, they
+        are left for a later eviction.
+        """
+
+        try:
+            os.remove(path)
+        except (FileNotFoundError, PermissionError):
+            pass
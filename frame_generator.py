@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+#
+# Parametric multi-storey, multi-bay plane frame.
+#
+# The frame is generated from the number of storeys and bays, the
+# storey heights and bay widths and section tables for columns and
+# beams. Nodes are numbered level by level from the base, left to right,
+# with three DOFs (ux, uy, rotation) per node. All base nodes are fixed.
+# Beams carry a distributed load q (local y) and each floor level can
+# carry a horizontal point load at its leftmost node.
+#
+# The stiffness matrix is assembled into a scipy.sparse matrix and the
+# reduced free-DOF system is solved with a sparse direct solver, so
+# memory and time scale with the number of non-zeros. Before the
+# factorization the free DOFs are reordered to reduce fill-in (minimum
+# degree by default, or reverse Cuthill-McKee to reduce bandwidth), the
+# solution is mapped back to the generated numbering so a, r and ed are
+# unaffected. Alternatively the reduced system can be solved with a
+# preconditioned conjugate gradient method (Jacobi or incomplete
+# factorization preconditioner), starting from the previous solution.
+#
+
+import warnings
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from frame_model import AssemblyPattern, beam2e_batch, beam2s_batch
+
+
+def _per_row(values, n, width=None):
+    """Broadcasts a scalar, a row or a table to n rows (last row repeats)."""
+
+    values = np.asarray(values, dtype=float)
+
+    if width is None:
+        values = np.atleast_1d(values)
+    else:
+        values = np.atleast_2d(values)
+
+    if values.shape[0] < n:
+        pad = np.repeat(values[-1:], n - values.shape[0], axis=0)
+        values = np.concatenate([values, pad])
+
+    return values[:n]
+
+
+def pcg(A, b, M=None, x0=None, tol=1e-8, maxiter=None):
+    """Solves A x = b with the preconditioned conjugate gradient method.
+
+    M is a function applying the inverse preconditioner to a vector. The
+    iteration stops when ||b - A x|| <= tol ||b||. Returns x and the list
+    of relative residual norms, one per iteration (the first entry is the
+    residual of x0).
+    """
+
+    n = b.shape[0]
+    maxiter = 10 * n if maxiter is None else maxiter
+
+    if M is None:
+        M = lambda r: r
+
+    x = np.zeros(n) if x0 is None else np.array(x0, dtype=float)
+    r = b - A @ x if x0 is not None else b.copy()
+
+    b_norm = np.linalg.norm(b)
+    if b_norm == 0.0:
+        return np.zeros(n), [0.0]
+
+    residuals = [np.linalg.norm(r) / b_norm]
+
+    z = M(r)
+    p = z.copy()
+    rz = r @ z
+
+    for i in range(maxiter):
+        if residuals[-1] <= tol:
+            break
+
+        Ap = A @ p
+        alpha = rz / (p @ Ap)
+        x += alpha * p
+        r -= alpha * Ap
+
+        residuals.append(np.linalg.norm(r) / b_norm)
+
+        z = M(r)
+        rz_new = r @ z
+        p = z + (rz_new / rz) * p
+        rz = rz_new
+
+    return x, residuals
+
+
+def _bandwidth(K):
+    """Returns the half bandwidth and the profile (skyline) of K."""
+
+    K = K.tocoo()
+    offset = K.row - K.col
+
+    if offset.size == 0:
+        return 0, 0
+
+    # Profile: for each row, the distance from the first non-zero to the diagonal.
+
+    first = np.full(K.shape[0], K.shape[0])
+    np.minimum.at(first, K.row, K.col)
+    first = np.minimum(first, np.arange(K.shape[0]))
+
+    return int(np.abs(offset).max()), int((np.arange(K.shape[0]) - first).sum())
+
+
+class GeneratedFrame:
+    def __init__(self, storeys=3, bays=2):
+        """Initializes the frame with default values."""
+
+        self.storeys = storeys
+        self.bays = bays
+
+        # Storey heights and bay widths, scalars or one value per storey/bay.
+
+        self.storey_height = 4.0
+        self.bay_width = 6.0
+
+        # Section tables, rows of [A, I] per storey (columns) and per
+        # floor level (beams). The last row is repeated for the rest.
+
+        self.E = 200.0e9
+        self.column_sections = [[2.0e-3, 1.6e-5]]
+        self.beam_sections = [[6.0e-3, 5.4e-5]]
+
+        # Loads, beam load q (N/m) and horizontal floor loads f (N),
+        # scalars or one value per floor level.
+
+        self.q = -10e3
+        self.f = 0.0
+
+        self.nep = 21
+
+        # DOF ordering used for the factorization: "rcm" (reverse
+        # Cuthill-McKee renumbering), "amd" (minimum degree ordering on
+        # K + K^T inside the sparse LU) or "natural" (generated numbering).
+
+        self.ordering = "amd"
+
+        # Solver for the reduced system, "direct" or "pcg". The iterative
+        # solver uses a "jacobi" or "ichol" (incomplete factorization)
+        # preconditioner and starts from the previous solution when
+        # warm_start is set and the number of DOFs is unchanged.
+
+        self.solver = "direct"
+        self.preconditioner = "ichol"
+        self.tol = 1e-8
+        self.maxiter = None
+        self.drop_tol = 1e-4
+        self.warm_start = True
+
+        self.a = None
+
+        self.pattern = None
+
+    def generate(self):
+        """Generates nodes, topology, DOF numbering and supports."""
+
+        n_lines = self.bays + 1
+        n_levels = self.storeys + 1
+
+        heights = _per_row(self.storey_height, self.storeys)
+        widths = _per_row(self.bay_width, self.bays)
+
+        x = np.concatenate([[0.0], np.cumsum(widths)])
+        y = np.concatenate([[0.0], np.cumsum(heights)])
+
+        # ----- Nodes, numbered level by level from the base -------------
+
+        self.coords = np.column_stack([np.tile(x, n_levels), np.repeat(y, n_lines)])
+        self.dofs = np.arange(1, 3 * self.coords.shape[0] + 1).reshape(-1, 3)
+
+        node = np.arange(n_levels * n_lines).reshape(n_levels, n_lines)
+
+        # ----- Elements, columns (bottom to top) followed by beams ------
+
+        column_nodes = np.column_stack([node[:-1, :].ravel(), node[1:, :].ravel()])
+        beam_nodes = np.column_stack([node[1:, :-1].ravel(), node[1:, 1:].ravel()])
+        element_nodes = np.concatenate([column_nodes, beam_nodes])
+
+        self.n_columns = column_nodes.shape[0]
+        self.n_beams = beam_nodes.shape[0]
+
+        self.edof = np.hstack([self.dofs[element_nodes[:, 0]], self.dofs[element_nodes[:, 1]]])
+        self.ex = self.coords[element_nodes, 0]
+        self.ey = self.coords[element_nodes, 1]
+
+        # ----- Element properties and loads ------------------------------
+
+        columns = _per_row(self.column_sections, self.storeys, 2)
+        beams = _per_row(self.beam_sections, self.storeys, 2)
+
+        section = np.concatenate([
+            np.repeat(columns, n_lines, axis=0),
+            np.repeat(beams, self.bays, axis=0)
+        ])
+
+        self.ep = np.column_stack([np.full(section.shape[0], self.E), section])
+
+        self.eq = np.zeros((self.edof.shape[0], 2))
+        self.eq[self.n_columns:, 1] = np.repeat(_per_row(self.q, self.storeys), self.bays)
+
+        # ----- Supports and nodal loads ---------------------------------
+
+        self.bc = self.dofs[node[0, :]].ravel()
+
+        self.f_nodal = np.zeros(self.dofs.size)
+        self.f_nodal[self.dofs[node[1:, 0], 0] - 1] = _per_row(self.f, self.storeys)
+
+    def element_matrices(self):
+        """Computes all element stiffness matrices and load vectors.
+
+        Returns Ke (n_el, 6, 6) and fe (n_el, 6) computed in one
+        vectorised pass with beam2e_batch.
+        """
+
+        return beam2e_batch(self.ex, self.ey, self.ep, self.eq)
+
+    def assembly_pattern(self):
+        """Returns the assembly pattern for the current topology.
+
+        The pattern is computed once and reused for as long as edof
+        stays the same.
+        """
+
+        if self.pattern is None or not np.array_equal(self.pattern.edof, self.edof):
+            self.pattern = AssemblyPattern(self.edof, self.dofs.size)
+
+        return self.pattern
+
+    def assemble(self):
+        """Assembles the sparse stiffness matrix and the load vector.
+
+        Returns K as a CSR matrix and f as a 1D array.
+        """
+
+        Ke, fe = self.element_matrices()
+        K, f = self.assembly_pattern().assemble(Ke, fe)
+
+        return K, f + self.f_nodal
+
+    def dof_order(self, Kff):
+        """Returns the solver ordering of the free DOFs.
+
+        order[i] is the position in the free DOF list of the DOF solved
+        as number i. Only "rcm" renumbers, "amd" leaves the ordering to
+        the sparse LU.
+        """
+
+        if self.ordering == "rcm":
+            return reverse_cuthill_mckee(Kff.tocsr(), symmetric_mode=True).astype(np.intp)
+
+        if self.ordering in ("amd", "natural"):
+            return np.arange(Kff.shape[0])
+
+        raise ValueError(f"Unknown DOF ordering: {self.ordering}")
+
+    def solve_direct(self, Kff, ff):
+        """Solves the reduced system with a sparse direct solver.
+
+        The free DOFs are reordered according to self.ordering and the
+        ordering statistics are stored in ordering_stats.
+        """
+
+        order = self.dof_order(Kff)
+        Kff_ordered = Kff[order, :][:, order].tocsc()
+
+        permc_spec = "MMD_AT_PLUS_A" if self.ordering == "amd" else "NATURAL"
+        lu = spla.splu(Kff_ordered, permc_spec=permc_spec,
+                       diag_pivot_thresh=0.0, options=dict(SymmetricMode=True))
+
+        # Map the solution back from the solver ordering.
+
+        af = np.empty(ff.size)
+        af[order] = lu.solve(ff[order])
+
+        # Statistics in the ordering actually used, including the column
+        # permutation chosen by the sparse LU (identity unless "amd").
+
+        lu_order = np.argsort(lu.perm_c)
+
+        bandwidth_before, profile_before = _bandwidth(Kff)
+        bandwidth, profile = _bandwidth(Kff_ordered[lu_order, :][:, lu_order])
+
+        self.ordering_stats = {
+            "ordering": self.ordering,
+            "free_dofs": ff.size,
+            "nnz": Kff.nnz,
+            "bandwidth_before": bandwidth_before,
+            "bandwidth": bandwidth,
+            "profile_before": profile_before,
+            "profile": profile,
+            "factor_nnz": lu.L.nnz + lu.U.nnz,
+            "fill_ratio": (lu.L.nnz + lu.U.nnz) / Kff.nnz
+        }
+
+        return af
+
+    def preconditioner_function(self, Kff):
+        """Returns the inverse preconditioner for the PCG solver."""
+
+        if self.preconditioner == "jacobi":
+            d_inv = 1.0 / Kff.diagonal()
+            return lambda r: d_inv * r
+
+        if self.preconditioner == "ichol":
+
+            # scipy has no incomplete Cholesky. An incomplete LU in
+            # symmetric mode (diagonal pivots, symmetric ordering) is
+            # computed instead and only L and the pivots are used, giving
+            # the symmetric positive definite preconditioner L D L^T.
+
+            ilu = spla.spilu(Kff.tocsc(), drop_tol=self.drop_tol, permc_spec="MMD_AT_PLUS_A",
+                             diag_pivot_thresh=0.0, options=dict(SymmetricMode=True))
+
+            L = ilu.L.tocsr()
+            Lt = ilu.L.T.tocsr()
+            d = ilu.U.diagonal()
+            order = np.argsort(ilu.perm_c)
+
+            def apply(r):
+                z = spla.spsolve_triangular(L, r[order], lower=True, unit_diagonal=True)
+                z = spla.spsolve_triangular(Lt, z / d, lower=False, unit_diagonal=True)
+                x = np.empty_like(r)
+                x[order] = z
+                return x
+
+            return apply
+
+        raise ValueError(f"Unknown preconditioner: {self.preconditioner}")
+
+    def solve_pcg(self, Kff, ff, x0=None):
+        """Solves the reduced system with preconditioned CG.
+
+        The number of iterations and the relative residual history are
+        stored in iterations and residuals, and converged tells whether
+        tol was reached. A RuntimeWarning is issued if it was not.
+        """
+
+        M = self.preconditioner_function(Kff)
+        af, self.residuals = pcg(Kff, ff, M, x0, self.tol, self.maxiter)
+
+        self.iterations = len(self.residuals) - 1
+        self.converged = self.residuals[-1] <= self.tol
+
+        if not self.converged:
+            warnings.warn(f"PCG did not converge in {self.iterations} iterations "
+                          f"(residual {self.residuals[-1]:.2e})", RuntimeWarning, stacklevel=3)
+
+        return af
+
+    def solve(self):
+        """Generates, assembles and solves the frame."""
+
+        self.generate()
+
+        K, f = self.assemble()
+
+        # ----- Solve the reduced system and compute reactions -----------
+
+        n_dofs = K.shape[0]
+        free = np.setdiff1d(np.arange(n_dofs), self.bc - 1)
+
+        Kff = K[free, :][:, free].tocsr()
+
+        x0 = None
+        if self.warm_start and self.a is not None and self.a.size == n_dofs:
+            x0 = self.a[free]
+
+        self.a = np.zeros(n_dofs)
+
+        if self.solver == "direct":
+            self.a[free] = self.solve_direct(Kff, f[free])
+        elif self.solver == "pcg":
+            self.a[free] = self.solve_pcg(Kff, f[free], x0)
+        else:
+            raise ValueError(f"Unknown solver: {self.solver}")
+
+        self.r = K @ self.a - f
+
+        self.K = K
+        self.ed = self.a[self.edof - 1]
+
+        self.es, self.edi, self.ec = beam2s_batch(
+            self.ex, self.ey, self.ep, self.ed, self.eq, nep=self.nep)
+
+    def print_results(self):
+        """Prints a summary of the results."""
+
+        n_nodes = self.coords.shape[0]
+
+        print(f"Storeys: {self.storeys}, bays: {self.bays}")
+        print(f"Nodes: {n_nodes}, elements: {self.edof.shape[0]}, DOFs: {self.dofs.size}")
+        print(f"Non-zeros in K: {self.K.nnz}")
+
+        if self.solver == "pcg":
+            print(f"PCG ({self.preconditioner}): {self.iterations} iterations, "
+                  f"residual {self.residuals[-1]:.2e}"
+                  + ("" if self.converged else " (not converged)"))
+        else:
+            stats = self.ordering_stats
+
+            print(f"DOF ordering: {stats['ordering']}, free DOFs: {stats['free_dofs']}")
+            print(f"Bandwidth: {stats['bandwidth_before']} -> {stats['bandwidth']}")
+            print(f"Profile: {stats['profile_before']} -> {stats['profile']}")
+            print(f"Non-zeros in factor: {stats['factor_nnz']} (fill ratio {stats['fill_ratio']:.2f})")
+        print(f"Max |ux|: {np.abs(self.a[0::3]).max():.4e}")
+        print(f"Max |uy|: {np.abs(self.a[1::3]).max():.4e}")
+        print(f"Max |N|:  {np.abs(self.es[:, :, 0]).max():.4e}")
+        print(f"Max |Vy|: {np.abs(self.es[:, :, 1]).max():.4e}")
+        print(f"Max |Mz|: {np.abs(self.es[:, :, 2]).max():.4e}")
+
+
+if __name__ == "__main__":
+
+    frame = GeneratedFrame(storeys=10, bays=5)
+    frame.f = 2e3
+    frame.solve()
+    frame.print_results()
@@ -11,17 +11,893 @@
 #
 # The model is solved using the calfem finite element library.
 # The results are displayed using the calfem matplotlib visualization
-# library.
+# library. The visualization and report modules are imported when first
+# used, so importing this module for solving only loads NumPy, SciPy and
+# calfem.core.
+#
+# Models are saved as JSON (input parameters only) or, for files ending
+# in .frm, in a binary container holding the parameters and the results
+# of the last solve. Binary files are memory-mapped when loaded.
 #
 
-import sys, json
+import sys, os, stat, json, io, struct, tempfile, threading, contextlib
+from collections import OrderedDict
 
 import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import cho_factor, cho_solve
 import calfem.core as cfc
-import calfem.utils as cfu
-import calfem.vis_mpl as cfv
+
+
+def _beam2_transform(dx, dy, L):
+    """Returns stacked local-to-global transformation matrices G."""
+
+    nxX = dx / L
+    nyX = dy / L
+    nxY = -dy / L
+    nyY = dx / L
+
+    G = np.zeros(L.shape + (6, 6))
+    G[..., 0, 0] = nxX
+    G[..., 0, 1] = nyX
+    G[..., 1, 0] = nxY
+    G[..., 1, 1] = nyY
+    G[..., 2, 2] = 1.0
+    G[..., 3, 3] = nxX
+    G[..., 3, 4] = nyX
+    G[..., 4, 3] = nxY
+    G[..., 4, 4] = nyY
+    G[..., 5, 5] = 1.0
+
+    return G
+
+
+def _beam2_load(qX, qY, L):
+    """Returns stacked local equivalent nodal loads for uniform loads."""
+
+    return L[..., None] * np.stack([
+        qX / 2, qY / 2, qY * L / 12, qX / 2, qY / 2, -qY * L / 12
+    ], axis=-1)
+
+
+def beam2e_batch(ex, ey, ep, eq):
+    """Computes stacked beam element stiffness matrices and load vectors.
+
+    Vectorised counterpart of cfc.beam2e. The leading dimensions of the
+    arguments are broadcast against each other.
+
+    ex, ey: (..., 2) element node coordinates.
+    ep: (..., 3) element properties [E, A, I].
+    eq: (..., 2) distributed loads [qX, qY] in local directions.
+
+    Returns Ke (..., 6, 6) and fe (..., 6).
+    """
+
+    ex = np.asarray(ex, dtype=float)
+    ey = np.asarray(ey, dtype=float)
+    ep = np.asarray(ep, dtype=float)
+    eq = np.asarray(eq, dtype=float)
+
+    DEA = ep[..., 0] * ep[..., 1]
+    DEI = ep[..., 0] * ep[..., 2]
+    qX = eq[..., 0]
+    qY = eq[..., 1]
+
+    dx = ex[..., 1] - ex[..., 0]
+    dy = ey[..., 1] - ey[..., 0]
+    L = np.sqrt(dx * dx + dy * dy)
+
+    DEA, DEI, qX, qY, dx, dy, L = np.broadcast_arrays(DEA, DEI, qX, qY, dx, dy, L)
+
+    k1 = DEA / L
+    k2 = 12 * DEI / L**3
+    k3 = 6 * DEI / L**2
+    k4 = 4 * DEI / L
+    k5 = 2 * DEI / L
+
+    Kle = _beam2_stiffness(k1, k2, k3, k4, k5)
+    fle = _beam2_load(qX, qY, L)
+
+    G = _beam2_transform(dx, dy, L)
+    Gt = np.swapaxes(G, -1, -2)
+
+    Ke = Gt @ Kle @ G
+    fe = (Gt @ fle[..., None])[..., 0]
+
+    return Ke, fe
+
+
+def _beam2_stiffness(k1, k2, k3, k4, k5):
+    """Returns stacked local stiffness matrices from their coefficients."""
+
+    Kle = np.zeros(k1.shape + (6, 6))
+    Kle[..., 0, 0] = k1
+    Kle[..., 0, 3] = -k1
+    Kle[..., 3, 0] = -k1
+    Kle[..., 3, 3] = k1
+    Kle[..., 1, 1] = k2
+    Kle[..., 1, 2] = k3
+    Kle[..., 1, 4] = -k2
+    Kle[..., 1, 5] = k3
+    Kle[..., 2, 1] = k3
+    Kle[..., 2, 2] = k4
+    Kle[..., 2, 4] = -k3
+    Kle[..., 2, 5] = k5
+    Kle[..., 4, 1] = -k2
+    Kle[..., 4, 2] = -k3
+    Kle[..., 4, 4] = k2
+    Kle[..., 4, 5] = -k3
+    Kle[..., 5, 1] = k3
+    Kle[..., 5, 2] = k5
+    Kle[..., 5, 4] = -k3
+    Kle[..., 5, 5] = k4
+
+    return Kle
+
+
+def beam2f_batch(ex, ey, eq):
+    """Computes stacked equivalent nodal load vectors fe (..., 6).
+
+    Same as the fe returned by beam2e_batch, without building the
+    stiffness matrices.
+    """
+
+    ex = np.asarray(ex, dtype=float)
+    ey = np.asarray(ey, dtype=float)
+    eq = np.asarray(eq, dtype=float)
+
+    dx = ex[..., 1] - ex[..., 0]
+    dy = ey[..., 1] - ey[..., 0]
+    L = np.sqrt(dx * dx + dy * dy)
+
+    qX, qY, dx, dy, L = np.broadcast_arrays(eq[..., 0], eq[..., 1], dx, dy, L)
+
+    G = _beam2_transform(dx, dy, L)
+
+    return (np.swapaxes(G, -1, -2) @ _beam2_load(qX, qY, L)[..., None])[..., 0]
+
+
+def check_nep(nep):
+    """Returns nep as an int, raises ValueError unless it is usable.
+
+    Section forces are evaluated at both element ends, so at least two
+    evaluation points are needed.
+    """
+
+    if isinstance(nep, bool) or not isinstance(nep, (int, np.integer)) or nep < 2:
+        raise ValueError(f"nep must be an integer of at least 2, got {nep!r}.")
+
+    return int(nep)
+
+
+def beam2s_batch(ex, ey, ep, ed, eq, nep=21):
+    """Computes stacked section forces for beam elements.
+
+    Vectorised counterpart of cfc.beam2s. Arguments are as for
+    beam2e_batch with ed (..., 6) holding the element displacements.
+
+    Returns es (..., nep, 3) with [N, Vy, Mz], edi (..., nep, 2) with the
+    local displacements [u, v] and ec (..., nep, 1) with the local
+    evaluation coordinates.
+    """
+
+    check_nep(nep)
+
+    ex = np.asarray(ex, dtype=float)
+    ey = np.asarray(ey, dtype=float)
+    ep = np.asarray(ep, dtype=float)
+    ed = np.asarray(ed, dtype=float)
+    eq = np.asarray(eq, dtype=float)
+
+    DEA = ep[..., 0] * ep[..., 1]
+    DEI = ep[..., 0] * ep[..., 2]
+    qX = eq[..., 0]
+    qY = eq[..., 1]
+
+    dx = ex[..., 1] - ex[..., 0]
+    dy = ey[..., 1] - ey[..., 0]
+    L = np.sqrt(dx * dx + dy * dy)
+
+    shape = np.broadcast_shapes(DEA.shape, DEI.shape, qX.shape, L.shape, ed.shape[:-1])
+    DEA, DEI, qX, qY, dx, dy, L = [
+        np.broadcast_to(v, shape) for v in (DEA, DEI, qX, qY, dx, dy, L)]
+
+    G = _beam2_transform(dx, dy, L)
+    edl = (G @ ed[..., None])[..., 0]
+
+    # ----- Polynomial coefficients of the local displacement fields -----
+
+    c10 = edl[..., 0]
+    c11 = (edl[..., 3] - edl[..., 0]) / L
+
+    v1 = edl[..., 1]
+    t1 = edl[..., 2]
+    v2 = edl[..., 4]
+    t2 = edl[..., 5]
+    c20 = v1
+    c21 = t1
+    c22 = -3 * v1 / L**2 - 2 * t1 / L + 3 * v2 / L**2 - t2 / L
+    c23 = 2 * v1 / L**3 + t1 / L**2 - 2 * v2 / L**3 + t2 / L**2
+
+    # ----- Evaluate fields at the stations ------------------------------
+
+    # Stations as in cfc.beam2s (multiples of L/(nep-1)), but always
+    # exactly nep of them.
+
+    Lc = L[..., None]
+    X = np.arange(nep) * (Lc / (nep - 1))
+
+    inv_DEA = np.divide(1.0, DEA, out=np.zeros(shape), where=DEA != 0)[..., None]
+    inv_DEI = np.divide(1.0, DEI, out=np.zeros(shape), where=DEI != 0)[..., None]
+    qXc = qX[..., None]
+    qYc = qY[..., None]
+
+    u = c10[..., None] + c11[..., None] * X - (X**2 - Lc * X) * qXc * inv_DEA / 2
+    du = c11[..., None] - (2 * X - Lc) * qXc * inv_DEA / 2
+
+    v = (c20[..., None] + c21[..., None] * X + c22[..., None] * X**2
+         + c23[..., None] * X**3
+         + (X**4 - 2 * Lc * X**3 + Lc**2 * X**2) * qYc * inv_DEI / 24)
+    d2v = (2 * c22[..., None] + 6 * c23[..., None] * X
+           + (6 * X**2 - 6 * Lc * X + Lc**2) * qYc * inv_DEI / 12)
+    d3v = 6 * c23[..., None] + (2 * X - Lc) * qYc * inv_DEI / 2
+
+    N = DEA[..., None] * du
+    M = DEI[..., None] * d2v
+    V = -DEI[..., None] * d3v
+
+    es = np.stack([N, V, M], axis=-1)
+    edi = np.stack([u, v], axis=-1)
+    ec = X[..., None]
+
+    return es, edi, ec
+
+
+def beam2e_derivative_batch(ex, ey, ep, eq, dL, dDEA, dDEI, dqX, dqY):
+    """Computes derivatives of stacked element stiffness matrices and loads.
+
+    ex, ey, ep and eq are as for beam2e_batch. dL, dDEA, dDEI, dqX and
+    dqY (...) are the derivatives of the element length, of E*A and E*I
+    and of the loads with respect to one design parameter. The element
+    directions are taken as fixed.
+
+    Returns dKe (..., 6, 6) and dfe (..., 6).
+    """
+
+    ex = np.asarray(ex, dtype=float)
+    ey = np.asarray(ey, dtype=float)
+    ep = np.asarray(ep, dtype=float)
+    eq = np.asarray(eq, dtype=float)
+
+    DEA = ep[..., 0] * ep[..., 1]
+    DEI = ep[..., 0] * ep[..., 2]
+    qX = eq[..., 0]
+    qY = eq[..., 1]
+
+    dx = ex[..., 1] - ex[..., 0]
+    dy = ey[..., 1] - ey[..., 0]
+    L = np.sqrt(dx * dx + dy * dy)
+
+    DEA, DEI, qX, qY, dx, dy, L, dL, dDEA, dDEI, dqX, dqY = np.broadcast_arrays(
+        DEA, DEI, qX, qY, dx, dy, L, dL, dDEA, dDEI, dqX, dqY)
+
+    dk1 = dDEA / L - DEA * dL / L**2
+    dk2 = 12 * (dDEI / L**3 - 3 * DEI * dL / L**4)
+    dk3 = 6 * (dDEI / L**2 - 2 * DEI * dL / L**3)
+    dk4 = 4 * (dDEI / L - DEI * dL / L**2)
+    dk5 = 2 * (dDEI / L - DEI * dL / L**2)
+
+    dKle = _beam2_stiffness(dk1, dk2, dk3, dk4, dk5)
+
+    # d(L * [qX/2, qY/2, qY L/12, ...])
+
+    dfle = np.stack([
+        (dL * qX + L * dqX) / 2,
+        (dL * qY + L * dqY) / 2,
+        (2 * L * dL * qY + L**2 * dqY) / 12,
+        (dL * qX + L * dqX) / 2,
+        (dL * qY + L * dqY) / 2,
+        -(2 * L * dL * qY + L**2 * dqY) / 12
+    ], axis=-1)
+
+    G = _beam2_transform(dx, dy, L)
+    Gt = np.swapaxes(G, -1, -2)
+
+    dKe = Gt @ dKle @ G
+    dfe = (Gt @ dfle[..., None])[..., 0]
+
+    return dKe, dfe
+
+
+def beam2s_derivative_batch(ex, ey, ep, ed, eq, ded, dL, dDEA, dDEI, dqX, dqY, nep=21):
+    """Computes derivatives of stacked section forces.
+
+    Arguments are as for beam2s_batch and beam2e_derivative_batch, with
+    ded (..., 6) the derivative of the element displacements. Stations
+    stay at the same relative positions along the element.
+
+    Returns des (..., nep, 3) with the derivatives of [N, Vy, Mz].
+    """
+
+    check_nep(nep)
+
+    ex = np.asarray(ex, dtype=float)
+    ey = np.asarray(ey, dtype=float)
+    ep = np.asarray(ep, dtype=float)
+    ed = np.asarray(ed, dtype=float)
+    eq = np.asarray(eq, dtype=float)
+    ded = np.asarray(ded, dtype=float)
+
+    DEA = ep[..., 0] * ep[..., 1]
+    DEI = ep[..., 0] * ep[..., 2]
+    qX = eq[..., 0]
+    qY = eq[..., 1]
+
+    dx = ex[..., 1] - ex[..., 0]
+    dy = ey[..., 1] - ey[..., 0]
+    L = np.sqrt(dx * dx + dy * dy)
+
+    shape = np.broadcast_shapes(DEA.shape, DEI.shape, qX.shape, L.shape, ed.shape[:-1],
+                                ded.shape[:-1], np.shape(dL), np.shape(dDEA), np.shape(dDEI),
+                                np.shape(dqX), np.shape(dqY))
+    DEA, DEI, qX, qY, dx, dy, L, dL, dDEA, dDEI, dqX, dqY = [
+        np.broadcast_to(v, shape) for v in (DEA, DEI, qX, qY, dx, dy, L, dL, dDEA, dDEI, dqX, dqY)]
+
+    G = _beam2_transform(dx, dy, L)
+    edl = (G @ ed[..., None])[..., 0]
+    dedl = (G @ ded[..., None])[..., 0]
+
+    # ----- Polynomial coefficients and their derivatives ----------------
+
+    u1, v1, t1, u2, v2, t2 = np.moveaxis(edl, -1, 0)
+    du1, dv1, dt1, du2, dv2, dt2 = np.moveaxis(dedl, -1, 0)
+
+    c11 = (u2 - u1) / L
+    dc11 = (du2 - du1) / L - c11 * dL / L
+
+    c22 = -3 * v1 / L**2 - 2 * t1 / L + 3 * v2 / L**2 - t2 / L
+    dc22 = (-3 * dv1 / L**2 - 2 * dt1 / L + 3 * dv2 / L**2 - dt2 / L
+            + dL * (6 * v1 / L**3 + 2 * t1 / L**2 - 6 * v2 / L**3 + t2 / L**2))
+
+    c23 = 2 * v1 / L**3 + t1 / L**2 - 2 * v2 / L**3 + t2 / L**2
+    dc23 = (2 * dv1 / L**3 + dt1 / L**2 - 2 * dv2 / L**3 + dt2 / L**2
+            + dL * (-6 * v1 / L**4 - 2 * t1 / L**3 + 6 * v2 / L**4 - 2 * t2 / L**3))
+
+    # ----- Stations, X = xi * L -----------------------------------------
+
+    xi = np.arange(nep) / (nep - 1)
+    Lc, dLc = L[..., None], dL[..., None]
+    X = xi * Lc
+    dX = xi * dLc
+
+    def c(v):
+        return v[..., None]
+
+    # N = DEA c11 - (2X - L) qX / 2
+
+    dN = (c(dDEA * c11 + DEA * dc11) - (2 * dX - dLc) * c(qX) / 2
+          - (2 * X - Lc) * c(dqX) / 2)
+
+    # V = -6 DEI c23 - (2X - L) qY / 2
+
+    dV = (-6 * c(dDEI * c23 + DEI * dc23) - (2 * dX - dLc) * c(qY) / 2
+          - (2 * X - Lc) * c(dqY) / 2)
+
+    # M = DEI (2 c22 + 6 c23 X) + (6X^2 - 6LX + L^2) qY / 12
+
+    dM = (c(dDEI) * (2 * c(c22) + 6 * c(c23) * X)
+          + c(DEI) * (2 * c(dc22) + 6 * c(dc23) * X + 6 * c(c23) * dX)
+          + (12 * X * dX - 6 * dLc * X - 6 * Lc * dX + 2 * Lc * dLc) * c(qY) / 12
+          + (6 * X**2 - 6 * Lc * X + Lc**2) * c(dqY) / 12)
+
+    return np.stack([dN, dV, dM], axis=-1)
+
+
+class AssemblyPattern:
+    """Precomputed sparsity pattern and scatter indices for a topology.
+
+    Built once from edof. Assembling stacked element matrices is then a
+    single bincount into the CSR value array, so repeated assemblies on
+    the same topology only refill the values. Small systems can be
+    assembled straight into dense matrices the same way.
+    """
+
+    def __init__(self, edof, n_dofs=None):
+        """Computes the CSR structure and the element-to-value scatter map."""
+
+        self.edof = np.array(edof)
+
+        idx = self.edof - 1
+        n_el, n_el_dofs = idx.shape
+
+        self.n_dofs = int(idx.max()) + 1 if n_dofs is None else n_dofs
+
+        rows = np.repeat(idx, n_el_dofs, axis=1).ravel().astype(np.int64)
+        cols = np.tile(idx, (1, n_el_dofs)).ravel().astype(np.int64)
+
+        self.dense_index = rows * self.n_dofs + cols
+
+        keys, self.scatter = np.unique(self.dense_index, return_inverse=True)
+        self.scatter = self.scatter.ravel()
+
+        self.indices = (keys % self.n_dofs).astype(np.int32)
+        self.indptr = np.concatenate([
+            [0], np.cumsum(np.bincount(keys // self.n_dofs, minlength=self.n_dofs))
+        ]).astype(np.int32)
+        self.nnz = keys.size
+
+        self.dof_index = idx.ravel()
+
+    def assemble(self, Ke, fe=None):
+        """Assembles stacked Ke (n_el, 6, 6) and optionally fe (n_el, 6).
+
+        Returns K as a CSR matrix, and f as a 1D array if fe is given.
+        """
+
+        data = np.bincount(self.scatter, weights=np.ravel(Ke), minlength=self.nnz)
+        K = sp.csr_matrix((data, self.indices, self.indptr), shape=(self.n_dofs, self.n_dofs))
+
+        if fe is None:
+            return K
+
+        return K, self.assemble_vector(fe)
+
+    def assemble_dense(self, Ke):
+        """Assembles stacked Ke (..., n_el, 6, 6) into dense matrices.
+
+        Returns an array (..., n_dofs, n_dofs), one matrix per set of
+        element matrices, e.g. one per parameter set.
+        """
+
+        Ke = np.asarray(Ke, dtype=float)
+        batch = Ke.shape[:-3]
+        n = int(np.prod(batch))
+        size = self.n_dofs * self.n_dofs
+
+        index = (np.arange(n)[:, None] * size + self.dense_index).ravel()
+        K = np.bincount(index, weights=Ke.ravel(), minlength=n * size)
+
+        return K.reshape(batch + (self.n_dofs, self.n_dofs))
+
+    def assemble_vector(self, fe):
+        """Assembles stacked element vectors fe (..., n_el, 6).
+
+        Returns an array (..., n_dofs), one assembled vector per set of
+        element vectors, e.g. one per load case.
+        """
+
+        fe = np.asarray(fe, dtype=float)
+        batch = fe.shape[:-2]
+        n = int(np.prod(batch))
+
+        index = (np.arange(n)[:, None] * self.n_dofs + self.dof_index).ravel()
+        f = np.bincount(index, weights=fe.ravel(), minlength=n * self.n_dofs)
+
+        return f.reshape(batch + (self.n_dofs,))
+
+
+class LRUCache:
+    """Least recently used cache that can be shared between threads.
+
+    Lookups and insertions hold a lock, so copies of a model that share
+    the cache can solve in different threads. hits and misses count the
+    lookups of all users of the cache.
+    """
+
+    def __init__(self, maxsize):
+        """Creates an empty cache holding at most maxsize items."""
+
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        with self._lock:
+            return {"_maxsize": self._maxsize, "hits": self.hits, "misses": self.misses,
+                    "_items": OrderedDict(self._items)}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def get(self, key):
+        """Returns the item for key, marked as most recently used, or None."""
+
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+
+            return value
+
+    def put(self, key, value):
+        """Adds an item, evicting the least recently used ones."""
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._evict()
+
+    @property
+    def maxsize(self):
+        """Maximum number of items, lowering it evicts the oldest items."""
+
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def _evict(self):
+        while len(self._items) > self._maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        """Removes all items."""
+
+        with self._lock:
+            self._items.clear()
+
+
+def _row(name, i):
+    """Returns a property giving row i of the array attribute name."""
+
+    return property(lambda self: getattr(self, name)[i], doc=f"{name}[{i}]")
+
+
+class FrameResult:
+    """Results of one solve of a FrameModel.
+
+    All arrays are views into one contiguous float buffer, so a result
+    is cheap to copy, pickle and keep in bulk, and can be passed around
+    without its model. es1..es3, edi1..edi3, ec1..ec3, ex1..ex3 and
+    ey1..ey3 are views of the rows (one per beam) of es, edi, ec, ex and
+    ey.
+    """
+
+    __slots__ = ("nep", "buffer", "a", "r", "ed", "ex", "ey", "es", "edi", "ec")
+
+    def __init__(self, nep=21, buffer=None):
+        """Creates a result for nep evaluation points per beam.
+
+        If buffer is given the views are created on it, otherwise a new
+        zero-filled buffer is allocated.
+        """
+
+        layout = self.layout(nep)
+        size = sum(int(np.prod(shape)) for name, shape in layout)
+
+        if buffer is None:
+            buffer = np.zeros(size)
+        elif buffer.shape != (size,):
+            raise ValueError(f"Result buffer must have {size} values for nep={nep}.")
+
+        self.nep = nep
+        self.buffer = buffer
+
+        start = 0
+        for name, shape in layout:
+            stop = start + int(np.prod(shape))
+            setattr(self, name, buffer[start:stop].reshape(shape))
+            start = stop
+
+    @staticmethod
+    def layout(nep):
+        """Returns the (name, shape) of each array in buffer order."""
+
+        return [
+            ("a", (12, 1)),
+            ("r", (12, 1)),
+            ("ed", (3, 6)),
+            ("ex", (3, 2)),
+            ("ey", (3, 2)),
+            ("es", (3, nep, 3)),
+            ("edi", (3, nep, 2)),
+            ("ec", (3, nep, 1))
+        ]
+
+    es1, es2, es3 = (_row("es", i) for i in range(3))
+    edi1, edi2, edi3 = (_row("edi", i) for i in range(3))
+    ec1, ec2, ec3 = (_row("ec", i) for i in range(3))
+    ex1, ex2, ex3 = (_row("ex", i) for i in range(3))
+    ey1, ey2, ey3 = (_row("ey", i) for i in range(3))
+
+    # All array names, including the per-beam views.
+
+    names = __slots__[2:] + tuple(
+        f"{name}{i}" for name in ("es", "edi", "ec", "ex", "ey") for i in (1, 2, 3))
+
+    def __copy__(self):
+        return FrameResult(self.nep, np.array(self.buffer))
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def __reduce__(self):
+        return FrameResult, (self.nep, np.asarray(self.buffer))
+
+
+# ----- Binary container ---------------------------------------------------
+#
+# Layout (all little-endian):
+#
+#   8 bytes   magic b"FRAMEBIN"
+#   4 bytes   format version (uint32)
+#   4 bytes   header length in bytes (uint32)
+#   header    UTF-8 JSON, padded with spaces to a multiple of 64 bytes
+#   arrays    contiguous, each starting on a 64 byte boundary
+#
+# The header holds the user data plus an "arrays" table with the dtype,
+# shape and file offset of each array.
+
+# Version of the solver numerics. Bump it when a change alters results,
+# so cached results from older versions are not reused.
+
+SOLVER_VERSION = 1
+
+# Version of the "FrameModel" header schema and result layout. Bump it
+# when FrameResult.layout or the header contents change.
+
+MODEL_SCHEMA_VERSION = 1
+
+BINARY_SUFFIX = ".frm"
+BINARY_MAGIC = b"FRAMEBIN"
+BINARY_VERSION = 1
+BINARY_ALIGN = 64
+
+
+def _aligned(n):
+    """Rounds n up to a multiple of BINARY_ALIGN."""
+
+    return -(-n // BINARY_ALIGN) * BINARY_ALIGN
+
+
+def _container_header(specs, header):
+    """Lays out arrays given as {name: (dtype, shape)} after the header.
+
+    Returns the array table and the padded, encoded header text.
+    """
+
+    table = {}
+    offset = 0
+    for name, (dtype, shape) in specs.items():
+        dtype = np.dtype(dtype).newbyteorder("<")
+        table[name] = {"dtype": dtype.str, "shape": list(shape), "offset": offset}
+        offset = _aligned(offset + dtype.itemsize * int(np.prod(shape)))
+
+    # Offsets above are relative to the data section, which starts after
+    # the (padded) header. Grow the header space until the table fits.
+
+    header = dict(header or {})
+    prefix_size = len(BINARY_MAGIC) + 8
+    data_start = 0
+
+    while True:
+        shifted = {name: dict(entry, offset=entry["offset"] + data_start)
+                   for name, entry in table.items()}
+        text = json.dumps(dict(header, arrays=shifted)).encode("utf-8")
+        if prefix_size + len(text) <= data_start:
+            break
+        data_start = _aligned(prefix_size + len(text))
+
+    return shifted, text.ljust(data_start - prefix_size)
+
+
+def _write_container_header(file, text):
+    """Writes the magic, version, header length and header text."""
+
+    file.write(BINARY_MAGIC)
+    file.write(struct.pack("<II", BINARY_VERSION, len(text)))
+    file.write(text)
+
+
+def write_arrays(filename, arrays, header=None):
+    """Writes named arrays and a JSON header to a binary container."""
+
+    arrays = {name: np.ascontiguousarray(value) for name, value in arrays.items()}
+    table = create_arrays(
+        filename, {name: (value.dtype, value.shape) for name, value in arrays.items()}, header)
+
+    with open(filename, "r+b") as file:
+        for name, value in arrays.items():
+            file.seek(table[name]["offset"])
+            file.write(value.astype(table[name]["dtype"], copy=False).tobytes())
+
+
+def _default_mode():
+    """Returns the mode of new files under the current umask."""
+
+    umask = os.umask(0)
+    os.umask(umask)
+
+    return 0o666 & ~umask
+
+
+_DEFAULT_MODE = _default_mode()
+
+
+def replace_arrays(filename, arrays, header=None):
+    """Writes a binary container atomically.
+
+    The container is written to a temporary file in the same directory
+    and moved into place with os.replace, so readers never see a partial
+    file and a file mapped by the caller can be replaced. The file keeps
+    the mode of the file it replaces, new files get the default mode.
+    Returns the size of the written file.
+    """
+
+    try:
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        mode = _DEFAULT_MODE
+
+    fd, temp_path = tempfile.mkstemp(
+        suffix=".tmp", dir=os.path.dirname(os.path.abspath(filename)))
+    os.close(fd)
+
+    try:
+        write_arrays(temp_path, arrays, header)
+        os.chmod(temp_path, mode)
+        size = os.stat(temp_path).st_size
+        os.replace(temp_path, filename)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+    return size
+
+
+def create_arrays(filename, specs, header=None):
+    """Creates a binary container with preallocated, zero-filled arrays.
+
+    specs maps names to (dtype, shape). The file is sized without
+    writing the data. Returns the array table (dtype, shape and file
+    offset per name) so the arrays can be filled in place piece by
+    piece.
+    """
+
+    table, text = _container_header(specs, header)
+    size = max([entry["offset"] + np.dtype(entry["dtype"]).itemsize * int(np.prod(entry["shape"]))
+                for entry in table.values()], default=0)
+
+    with open(filename, "wb") as file:
+        _write_container_header(file, text)
+        file.truncate(max(size, file.tell()))
+
+    return table
+
+
+def read_header(filename):
+    """Returns the JSON header of a binary container."""
+
+    with open(filename, "rb") as file:
+        if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a binary frame file.")
+
+        version, length = struct.unpack("<II", file.read(8))
+        if version > BINARY_VERSION:
+            raise ValueError(f"{filename} has unsupported format version {version}.")
+
+        return json.loads(file.read(length).decode("utf-8"))
+
+
+def read_arrays(filename, mmap=True):
+    """Reads a binary container.
+
+    Returns (header, arrays). With mmap=True the arrays are read-only
+    np.memmap views of the file, otherwise they are read into memory.
+    """
+
+    header = read_header(filename)
+    arrays = {}
+
+    for name, entry in header.pop("arrays").items():
+        shape = tuple(entry["shape"])
+        if mmap and int(np.prod(shape)) > 0:
+            arrays[name] = np.memmap(filename, dtype=entry["dtype"], mode="r",
+                                     offset=entry["offset"], shape=shape)
+        else:
+            with open(filename, "rb") as file:
+                file.seek(entry["offset"])
+                arrays[name] = np.fromfile(
+                    file, dtype=entry["dtype"], count=int(np.prod(shape))).reshape(shape)
+
+    return header, arrays
+
+
+def check_model_header(header, filename):
+    """Raises ValueError unless header is a readable FrameModel header.
+
+    Checks the schema, its version and, if results are stored, that the
+    recorded layout matches FrameResult.layout.
+    """
+
+    if header.get("schema") != "FrameModel":
+        raise ValueError(
+            f"{filename} is not a frame model file (schema {header.get('schema')!r}).")
+
+    version = header.get("schema_version", 1)
+    if version != MODEL_SCHEMA_VERSION:
+        raise ValueError(f"{filename} has unsupported frame model schema version {version}.")
+
+    if "layout" in header:
+        layout = [[name, list(shape)] for name, shape in FrameResult.layout(header["nep"])]
+        if header["layout"] != layout:
+            raise ValueError(f"{filename} has a result layout this version cannot read.")
+
+
+def _beam_axis(ex, ey):
+    """Returns start point, unit direction and length of a beam."""
+
+    dx = float(ex[1]) - float(ex[0])
+    dy = float(ey[1]) - float(ey[0])
+    L = np.sqrt(dx * dx + dy * dy)
+
+    return float(ex[0]), float(ey[0]), dx / L, dy / L, L
+
+
+def _secforce_lines(ex, ey, es, sfac):
+    """Returns the diagram line and stripes drawn by cfv.secforce2.
+
+    Returns x, y of the diagram and the stripes as (nep, 2, 2) segments
+    from the beam axis to the diagram.
+    """
+
+    x0, y0, nx, ny, L = _beam_axis(ex, ey)
+
+    eci = np.linspace(0.0, L, len(es))
+    bx = x0 + eci * nx
+    by = y0 + eci * ny
+
+    s = np.asarray(es, dtype=float) * sfac
+    x = bx + s * ny
+    y = by - s * nx
+
+    stripes = np.stack([np.stack([bx, by], axis=-1), np.stack([x, y], axis=-1)], axis=1)
+
+    return x, y, stripes
+
+
+def _dispbeam_line(ex, ey, edi, sfac):
+    """Returns the deformed beam line drawn by cfv.dispbeam2."""
+
+    x0, y0, nx, ny, L = _beam_axis(ex, ey)
+
+    eci = np.linspace(0.0, L, edi.shape[0])
+    u = edi[:, 0] * sfac
+    v = edi[:, 1] * sfac
+
+    return x0 + eci * nx + u * nx - v * ny, y0 + eci * ny + u * ny + v * nx
+
 
 class FrameModel:
+
+    # Input parameters in the order used by save/load and the batch API.
+
+    parameters = ("w", "h", "E", "A1", "A2", "I1", "I2", "q1", "q2", "q3", "f1")
+
+    # Parameters the stiffness matrix depends on. Changing only the
+    # remaining (load) parameters reuses a cached factorization.
+
+    stiffness_parameters = ("w", "h", "E", "A1", "A2", "I1", "I2")
+
     def __init__(self):
         """Initializes the model with default values."""
 
@@ -43,15 +919,80 @@ class FrameModel:
             [4, 5, 6, 7, 8, 9]
         ])
 
-        self.normal_forces_fig = None
-        self.shear_forces_fig = None
-        self.moments_fig = None
-        self.deformed_fig = None
+        self.bc = np.array([1, 2, 3, 10, 11])
+        self.pattern = AssemblyPattern(self.edof)
 
-    def save(self, filename):
-        """Saves the model to a file."""
+        # Number of evaluation points per beam for section forces.
+
+        self.nep = 21
+
+        # In-memory LRU of stiffness factorizations. The capacity of
+        # both caches is set with factor_cache_size and result_cache_size.
+
+        self._factor_cache = LRUCache(8)
+
+        self.result = None
+
+        # In-memory LRU of solved states keyed by the parameter values,
+        # and an optional on-disk cache (see frame_cache.SolveCache).
+        # Shallow copies of the model share both in-memory caches.
+
+        self._result_cache = LRUCache(32)
+
+        self.solve_cache = None
+
+        self.load_cases = {}
+        self.load_case_results = None
+        self.envelope_results = None
+
+        self.figures = {}
+
+    def __getattr__(self, name):
+        """Gives access to the arrays of the last result (a, r, es1, ...)."""
+
+        result = self.__dict__.get("result")
+
+        if result is not None and name in FrameResult.names:
+            return getattr(result, name)
+
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @property
+    def factor_cache_size(self):
+        """Number of factorizations kept in memory."""
+
+        return self._factor_cache.maxsize
+
+    @factor_cache_size.setter
+    def factor_cache_size(self, size):
+        self._factor_cache.maxsize = size
+
+    @property
+    def result_cache_size(self):
+        """Number of solved states kept in memory."""
+
+        return self._result_cache.maxsize
+
+    @result_cache_size.setter
+    def result_cache_size(self, size):
+        self._result_cache.maxsize = size
 
-        param_dict = {
+    @property
+    def result_cache_hits(self):
+        """Number of solves served from the in-memory result cache."""
+
+        return self._result_cache.hits
+
+    @property
+    def result_cache_misses(self):
+        """Number of solves not found in the in-memory result cache."""
+
+        return self._result_cache.misses
+
+    def parameter_dict(self):
+        """Returns the input parameters as a dict."""
+
+        return {
             "w": self.w,
             "h": self.h,
             "E": self.E,
@@ -65,14 +1006,69 @@ class FrameModel:
             "f1": self.f1
         }
 
+    def save(self, filename):
+        """Saves the model to a file.
+
+        Files ending in .frm are written in the binary container format
+        together with the results of the last solve, other files as JSON
+        with the input parameters only. Binary files are replaced
+        atomically (see replace_arrays), so a model loaded from the same
+        file can be saved over it.
+        """
+
+        param_dict = self.parameter_dict()
+
+        if filename.endswith(BINARY_SUFFIX):
+            header = {
+                "schema": "FrameModel",
+                "schema_version": MODEL_SCHEMA_VERSION,
+                "parameters": param_dict
+            }
+            arrays = {}
+
+            if self.result is not None:
+
+                # Read memory-mapped results into memory, the mapped
+                # file may be the one being replaced.
+
+                if isinstance(self.result.buffer, np.memmap):
+                    self.result = FrameResult(self.result.nep, np.array(self.result.buffer))
+
+                header["nep"] = self.result.nep
+                header["layout"] = self.result.layout(self.result.nep)
+                arrays["result"] = self.result.buffer
+
+            replace_arrays(filename, arrays, header)
+            return
+
         with open(filename, "w") as file:
             json.dump(param_dict, file)
 
     def load(self, filename):
-        """Loads the model from a file."""
+        """Loads the model from a file.
+
+        Results stored in a binary file are restored (memory-mapped,
+        read-only) without solving, otherwise self.result is cleared.
+        Binary files of other kinds, such as frame_batch sweeps, or of
+        an unsupported schema version raise ValueError.
+        """
 
-        with open(filename, "r") as file:
-            param_dict = json.load(file)
+        with open(filename, "rb") as file:
+            binary = file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+        result = None
+
+        if binary:
+            header, arrays = read_arrays(filename)
+            check_model_header(header, filename)
+
+            param_dict = header["parameters"]
+
+            if "result" in arrays:
+                result = FrameResult(header["nep"], arrays["result"])
+        else:
+            with open(filename, "r") as file:
+                param_dict = json.load(file)
 
         self.w = param_dict["w"]
         self.h = param_dict["h"]
@@ -86,51 +1082,503 @@ class FrameModel:
         self.q3 = param_dict["q3"]
         self.f1 = param_dict["f1"]
 
-    def solve(self):
-        """Solves the model."""
-
-        ep1 = np.array([self.E, self.A1, self.I1])
-        ep3 = np.array([self.E, self.A2, self.I2])
-        self.ex1 = np.array([0, 0])
-        self.ex2 = np.array([self.w, self.w])
-        self.ex3 = np.array([0, self.w])
-        self.ey1 = np.array([self.h, 0])
-        self.ey2 = np.array([self.h, 0])
-        self.ey3 = np.array([self.h, self.h])
-        eq1 = np.array([0, self.q1])
-        eq2 = np.array([0, self.q2])
-        eq3 = np.array([0, self.q3])
-
-        Ke1, fe1 = cfc.beam2e(self.ex1, self.ey1, ep1, eq1)
-        Ke2, fe2 = cfc.beam2e(self.ex2, self.ey2, ep1, eq2)
-        Ke3, fe3 = cfc.beam2e(self.ex3, self.ey3, ep3, eq3)
+        self.result = result
 
-        # ----- Assemble Ke into K ---------------------------------------
+    def factorize(self):
+        """Returns the stiffness matrix and the factorization of its free part.
+
+        Returns (K, free, factor) where free holds the zero-based free
+        DOFs and factor is the Cholesky factorization of K[free, free].
+        Factorizations are kept in a small LRU cache keyed on the
+        stiffness parameters, so load-only changes skip assembly and
+        factorization.
+        """
+
+        key = self.stiffness_key()
+
+        cached = self._factor_cache.get(key)
+        if cached is not None:
+            return cached
+
+        ex, ey, ep = self.element_arrays()
+        Ke, fe = beam2e_batch(ex, ey, ep, np.zeros((3, 2)))
+
+        K = self.pattern.assemble_dense(Ke)
+
+        fixed = np.zeros(K.shape[0], dtype=bool)
+        fixed[self.bc - 1] = True
+        free = np.flatnonzero(~fixed)
+
+        factor = cho_factor(K[np.ix_(free, free)])
+
+        self._factor_cache.put(key, (K, free, factor))
+
+        return K, free, factor
+
+    def stiffness_key(self):
+        """Returns the stiffness parameters as a tuple of floats."""
+
+        return tuple(float(getattr(self, name)) for name in self.stiffness_parameters)
+
+    def element_arrays(self):
+        """Returns the element coordinates and properties as (3, ...) arrays.
+
+        Returns (ex, ey, ep) with one row per beam in edof order.
+        """
+
+        ex = np.array([[0.0, 0.0], [self.w, self.w], [0.0, self.w]])
+        ey = np.array([[self.h, 0.0], [self.h, 0.0], [self.h, self.h]])
+        ep = np.array([
+            [self.E, self.A1, self.I1],
+            [self.E, self.A1, self.I1],
+            [self.E, self.A2, self.I2]
+        ])
+
+        return ex, ey, ep
+
+    def add_load_case(self, name, q1=0.0, q2=0.0, q3=0.0, f1=0.0):
+        """Adds (or replaces) a named load case."""
+
+        self.load_cases[name] = {"q1": q1, "q2": q2, "q3": q3, "f1": f1}
+        self.load_case_results = None
+
+    def remove_load_case(self, name):
+        """Removes a named load case."""
+
+        del self.load_cases[name]
+        self.load_case_results = None
+
+    def solve_load_cases(self, nep=None):
+        """Solves all load cases against a single factorization of K.
+
+        The load vectors of all cases are assembled as columns of one
+        right-hand side and solved together. Results are stored in
+        load_case_results and returned as a dict of arrays stacked over
+        the cases, in the order of load_cases:
+
+            names  list of case names
+            key    (stiffness key, nep) of the solve (see stiffness_key)
+            a      (n_cases, 12)
+            r      (n_cases, 12)
+            ed     (n_cases, 3, 6)
+            es     (n_cases, 3, nep, 3)
+            edi    (n_cases, 3, nep, 2)
+            ec     (3, nep, 1)
+        """
+
+        if not self.load_cases:
+            raise ValueError("No load cases defined.")
+
+        nep = self.nep if nep is None else nep
+
+        names = list(self.load_cases)
+        loads = np.array([[self.load_cases[name][key] for key in ("q1", "q2", "q3", "f1")]
+                          for name in names], dtype=float)
+        n_cases = len(names)
+
+        K, free, factor = self.factorize()
+        ex, ey, ep = self.element_arrays()
+
+        eq = np.zeros((n_cases, 3, 2))
+        eq[:, :, 1] = loads[:, :3]
+
+        # ----- Assemble load vectors as columns -------------------------
+
+        fe = beam2f_batch(ex, ey, eq)
+
+        F = self.pattern.assemble_vector(fe).T
+        F[3, :] += loads[:, 3]
+
+        # ----- Solve all cases and compute reactions --------------------
+
+        A = np.zeros_like(F)
+        A[free, :] = cho_solve(factor, F[free, :])
+        R = K @ A - F
+
+        a = A.T
+        ed = a[:, self.edof - 1]
+        es, edi, ec = beam2s_batch(ex, ey, ep, ed, eq, nep=nep)
+
+        self.load_case_results = {
+            "names": names,
+            "key": (self.stiffness_key(), nep),
+            "a": a,
+            "r": R.T,
+            "ed": ed,
+            "es": es,
+            "edi": edi,
+            "ec": ec[0]
+        }
+
+        return self.load_case_results
+
+    def _solved_load_cases(self):
+        """Returns load_case_results, solving again if missing or stale.
+
+        The load case results are only valid for the geometry, section
+        properties and number of evaluation points they were solved with,
+        a change of any stiffness parameter or of nep triggers a new
+        solve.
+        """
+
+        results = self.load_case_results
+        if results is None or results["key"] != (self.stiffness_key(), self.nep):
+            results = self.solve_load_cases()
+
+        return results
+
+    def _case_factors(self, factors, names):
+        """Converts a factor dict or array to an array in load case order."""
+
+        if isinstance(factors, dict):
+            unknown = set(factors) - set(names)
+            if unknown:
+                raise KeyError(f"Unknown load cases: {', '.join(sorted(map(str, unknown)))}")
+            factors = [factors.get(name, 0.0) for name in names]
+
+        factors = np.asarray(factors, dtype=float)
+        if factors.shape[-1] != len(names):
+            raise ValueError("Number of factors does not match number of load cases.")
+
+        return factors
+
+    def combine(self, factors):
+        """Returns a linear combination of the solved load cases.
+
+        factors is either a dict mapping case names to factors (missing
+        cases get 0) or an array of shape (n_cases,) or (n_comb, n_cases)
+        in load case order. Since all results are linear in the loads no
+        new solve is needed unless the stiffness parameters or nep have
+        changed. The returned dict has the same keys as
+        load_case_results, with a leading n_comb axis for 2D factors.
+        """
+
+        results = self._solved_load_cases()
+
+        names = results["names"]
+        factors = self._case_factors(factors, names)
+
+        combined = {"names": names, "key": results["key"], "ec": results["ec"]}
+        for key in ("a", "r", "ed", "es", "edi"):
+            combined[key] = np.tensordot(factors, results[key], axes=1)
+
+        return combined
+
+    def envelope(self, combinations):
+        """Computes min/max section force envelopes over load combinations.
+
+        combinations is either a dict mapping combination names to factor
+        dicts ({case name: partial factor}) or an array of shape
+        (n_comb, n_cases) in load case order. The section forces of all
+        combinations are obtained with a single matrix product over the
+        solved load cases, which are solved again first if the stiffness
+        parameters or nep have changed.
+
+        Results are stored in envelope_results and returned as a dict:
+
+            names     combination names (indices for array input)
+            key       (stiffness key, nep) of the load cases
+            max, min  (3, nep, 3) extreme [N, Vy, Mz] per beam and station
+            max_comb  (3, nep, 3) index of the governing combination
+            min_comb  (3, nep, 3) index of the governing combination
+            ec        (3, nep, 1) evaluation coordinates
+        """
+
+        results = self._solved_load_cases()
+
+        names = results["names"]
+
+        if isinstance(combinations, dict):
+            comb_names = list(combinations)
+            C = np.array([self._case_factors(combinations[name], names)
+                          for name in comb_names]).reshape(len(comb_names), len(names))
+        else:
+            C = np.atleast_2d(self._case_factors(combinations, names))
+            comb_names = list(range(C.shape[0]))
+
+        es_cases = results["es"]
+        es = (C @ es_cases.reshape(len(names), -1)).reshape((C.shape[0],) + es_cases.shape[1:])
+
+        self.envelope_results = {
+            "names": comb_names,
+            "key": results["key"],
+            "max": es.max(axis=0),
+            "min": es.min(axis=0),
+            "max_comb": es.argmax(axis=0),
+            "min_comb": es.argmin(axis=0),
+            "ec": results["ec"]
+        }
+
+        return self.envelope_results
+
+    def state_key(self, nep=None):
+        """Returns the key of the current state in the result cache."""
+
+        nep = self.nep if nep is None else nep
+
+        return tuple(float(getattr(self, name)) for name in self.parameters), nep
+
+    def has_cached_result(self, nep=None):
+        """Returns True if solve() would be served from the result cache."""
+
+        return self.state_key(nep) in self._result_cache
+
+    def solve(self, nep=None):
+        """Solves the model.
+
+        The results are stored in self.result, a FrameResult. Section
+        forces are evaluated at nep points per beam (default self.nep)
+        for all beams at once.
+
+        The last result_cache_size solved states are kept in memory, so
+        solving a previously solved parameter set again is a lookup. If
+        solve_cache is set, the on-disk cache is consulted next and new
+        results are added to it.
+        """
+
+        nep = check_nep(self.nep if nep is None else nep)
 
-        K = np.array(np.zeros((12, 12)))
-        f = np.array(np.zeros((12, 1)))
-        f[3] = self.f1
+        key = self.state_key(nep)
 
-        K, f = cfc.assem(self.edof[0, :], K, Ke1, f, fe1)
-        K, f = cfc.assem(self.edof[1, :], K, Ke2, f, fe2)
-        K, f = cfc.assem(self.edof[2, :], K, Ke3, f, fe3)
+        result = self._result_cache.get(key)
+        if result is not None:
+            self.result = result
+            return
+
+        if self.solve_cache is not None:
+            result = self.solve_cache.get(self.parameter_dict(), nep)
+            if result is not None:
+                self._result_cache.put(key, result)
+                self.result = result
+                return
+
+        ex, ey, ep = self.element_arrays()
+        eq = np.array([[0, self.q1], [0, self.q2], [0, self.q3]], dtype=float)
+
+        # ----- Stiffness and factorization (cached) ---------------------
+
+        K, free, factor = self.factorize()
+
+        # ----- Assemble load vector -------------------------------------
+
+        fe = beam2f_batch(ex, ey, eq)
+
+        f = self.pattern.assemble_vector(fe).reshape(-1, 1)
+        f[3] += self.f1
 
         # ----- Solve the system of equations and compute reactions ------
 
-        bc = np.array([1, 2, 3, 10, 11])
-        self.a, self.r = cfc.solveq(K, f, bc)
+        result = FrameResult(nep)
+        result.ex[:] = ex
+        result.ey[:] = ey
+
+        result.a[free] = cho_solve(factor, f[free])
+        result.r[:] = K @ result.a - f
+
+        result.ed[:] = cfc.extract_ed(self.edof, result.a)
+
+        # ----- Section forces for all beams -----------------------------
+
+        result.es[:], result.edi[:], result.ec[:] = beam2s_batch(
+            ex, ey, ep, result.ed, eq, nep=nep)
+
+        self.result = result
+        self._result_cache.put(key, result)
+
+        if self.solve_cache is not None:
+            self.solve_cache.put(self.parameter_dict(), result)
+
+    def _parameter_derivatives(self, names):
+        """Returns the derivatives of the element quantities per parameter.
+
+        Returns a dict with dL, dDEA, dDEI, dqX and dqY (n_par, 3), the
+        derivatives of length, E*A, E*I and loads of each beam, and df
+        (n_par, 12) with the derivatives of the nodal loads.
+        """
+
+        n = len(names)
+        d = {key: np.zeros((n, 3)) for key in ("dL", "dDEA", "dDEI", "dqX", "dqY")}
+        d["df"] = np.zeros((n, 12))
+
+        for k, name in enumerate(names):
+            if name == "w":
+                d["dL"][k] = [0.0, 0.0, 1.0]
+            elif name == "h":
+                d["dL"][k] = [1.0, 1.0, 0.0]
+            elif name == "E":
+                d["dDEA"][k] = [self.A1, self.A1, self.A2]
+                d["dDEI"][k] = [self.I1, self.I1, self.I2]
+            elif name == "A1":
+                d["dDEA"][k] = [self.E, self.E, 0.0]
+            elif name == "A2":
+                d["dDEA"][k] = [0.0, 0.0, self.E]
+            elif name == "I1":
+                d["dDEI"][k] = [self.E, self.E, 0.0]
+            elif name == "I2":
+                d["dDEI"][k] = [0.0, 0.0, self.E]
+            elif name in ("q1", "q2", "q3"):
+                d["dqY"][k, int(name[1]) - 1] = 1.0
+            elif name == "f1":
+                d["df"][k, 3] = 1.0
+            else:
+                raise ValueError(f"Unknown parameter: {name}")
+
+        return d
+
+    def sensitivities(self, names=None, nep=None):
+        """Computes design sensitivities with the direct method.
+
+        For each parameter p in names (default all of FrameModel.parameters)
+        the derivative da/dp is solved from K da/dp = df/dp - dK/dp a,
+        using the cached factorization of K for all parameters at once.
+        dK/dp, df/dp and the section force derivatives are analytic.
+
+        Returns a dict of arrays stacked over the parameters:
+
+            names  list of parameter names
+            a      (n_par, 12)          da/dp
+            r      (n_par, 12)          dr/dp
+            ed     (n_par, 3, 6)        ded/dp
+            es     (n_par, 3, nep, 3)   d[N, Vy, Mz]/dp per beam
+        """
+
+        names = list(self.parameters if names is None else names)
+        nep = self.nep if nep is None else nep
+
+        # A lookup in the result cache if the state is already solved.
+
+        self.solve(nep)
+        result = self.result
+
+        K, free, factor = self.factorize()
+        ex, ey, ep = self.element_arrays()
+        eq = np.array([[0, self.q1], [0, self.q2], [0, self.q3]], dtype=float)
+
+        d = self._parameter_derivatives(names)
+        element_d = {key: d[key] for key in ("dL", "dDEA", "dDEI", "dqX", "dqY")}
+
+        # ----- Derivatives of K and f -----------------------------------
+
+        dKe, dfe = beam2e_derivative_batch(ex, ey, ep, eq, **element_d)
+
+        dK = self.pattern.assemble_dense(dKe)
+        df = self.pattern.assemble_vector(dfe) + d["df"]
+
+        # ----- Direct method, one solve with all parameters as columns --
 
-        self.ed = cfc.extract_ed(self.edof, self.a)
+        a = result.a[:, 0]
+        rhs = df - dK @ a
 
-        self.es1, self.edi1, self.ec1 = cfc.beam2s(
-            self.ex1, self.ey1, ep1, self.ed[0, :], eq1, nep=21)
-        self.es2, self.edi2, self.ec2 = cfc.beam2s(
-            self.ex2, self.ey2, ep1, self.ed[1, :], eq2, nep=21)
-        self.es3, self.edi3, self.ec3 = cfc.beam2s(
-            self.ex3, self.ey3, ep3, self.ed[2, :], eq3, nep=21)
+        da = np.zeros((len(names), K.shape[0]))
+        da[:, free] = cho_solve(factor, rhs[:, free].T).T
 
-    def print_results(self):
-        """Prints the results of the model."""
+        dr = dK @ a + da @ K.T - df
+
+        # ----- Section forces -------------------------------------------
+
+        ded = da[:, self.edof - 1]
+        des = beam2s_derivative_batch(ex, ey, ep, result.ed, eq, ded, nep=nep, **element_d)
+
+        return {"names": names, "a": da, "r": dr, "ed": ded, "es": des}
+
+    def solve_batch(self, nep=None, **params):
+        """Solves the model for many parameter sets at once.
+
+        Keyword arguments are any of the names in FrameModel.parameters,
+        given as scalars or 1D arrays of equal length N. Parameters that
+        are not given are taken from the model. All N systems are
+        assembled as stacked (N, 12, 12) matrices and solved with a single
+        batched call.
+
+        Returns a dict with the stacked results:
+
+            a   (N, 12)          displacements
+            r   (N, 12)          reactions
+            ed  (N, 3, 6)        element displacements
+            es  (N, 3, nep, 3)   section forces [N, Vy, Mz] per beam
+            edi (N, 3, nep, 2)   local displacements [u, v] per beam
+            ec  (N, 3, nep, 1)   evaluation coordinates per beam
+
+        Beam i corresponds to es{i+1}, edi{i+1} and ec{i+1} of solve().
+        """
+
+        unknown = set(params) - set(self.parameters)
+        if unknown:
+            raise TypeError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+        values = [np.asarray(params.get(name, getattr(self, name)), dtype=float)
+                  for name in self.parameters]
+        values = np.broadcast_arrays(*[np.atleast_1d(v) for v in values])
+        if values[0].ndim != 1:
+            raise ValueError("Batch parameters must be scalars or 1D arrays.")
+
+        w, h, E, A1, A2, I1, I2, q1, q2, q3, f1 = values
+        nep = check_nep(self.nep if nep is None else nep)
+        n = w.shape[0]
+        zero = np.zeros(n)
+
+        # ----- Element coordinates, properties and loads (N, 3, ...) ----
+
+        ex = np.stack([
+            np.stack([zero, zero], axis=-1),
+            np.stack([w, w], axis=-1),
+            np.stack([zero, w], axis=-1)
+        ], axis=1)
+        ey = np.stack([
+            np.stack([h, zero], axis=-1),
+            np.stack([h, zero], axis=-1),
+            np.stack([h, h], axis=-1)
+        ], axis=1)
+        ep = np.stack([
+            np.stack([E, A1, I1], axis=-1),
+            np.stack([E, A1, I1], axis=-1),
+            np.stack([E, A2, I2], axis=-1)
+        ], axis=1)
+        eq = np.stack([
+            np.stack([zero, q1], axis=-1),
+            np.stack([zero, q2], axis=-1),
+            np.stack([zero, q3], axis=-1)
+        ], axis=1)
+
+        Ke, fe = beam2e_batch(ex, ey, ep, eq)
+
+        # ----- Assemble Ke into K ---------------------------------------
+
+        n_dofs = self.pattern.n_dofs
+        K = self.pattern.assemble_dense(Ke)
+
+        f = self.pattern.assemble_vector(fe)
+        f[:, 3] += f1
+
+        # ----- Solve the reduced systems and compute reactions ----------
+
+        free = np.setdiff1d(np.arange(n_dofs), self.bc - 1)
+
+        a = np.zeros((n, n_dofs))
+        a[:, free] = np.linalg.solve(
+            K[:, free[:, None], free[None, :]], f[:, free, None])[..., 0]
+        r = (K @ a[..., None])[..., 0] - f
+
+        ed = a[:, self.edof - 1]
+
+        es, edi, ec = beam2s_batch(ex, ey, ep, ed, eq, nep=nep)
+
+        return {"a": a, "r": r, "ed": ed, "es": es, "edi": edi, "ec": ec}
+
+    def print_results(self, to_string=False):
+        """Prints the results of the model.
+
+        With to_string=True the report is returned as a string instead of
+        being printed.
+        """
+
+        if to_string:
+            buffer = io.StringIO()
+            with contextlib.redirect_stdout(buffer):
+                self.print_results()
+            return buffer.getvalue()
+
+        import calfem.utils as cfu
 
         cfu.disp_h2("Input parameters")
         cfu.disp_h3("Geometry")
@@ -144,120 +1592,237 @@ class FrameModel:
         cfu.disp_array(np.array([[self.q1, self.q2, self.q3, self.f1]]), [
                        "q1", "q2", "q3", "f1"])
 
-        cfu.disp_h2("es1")
-        cfu.disp_array(self.es1, ["N", "Vy", "Mz"])
-        cfu.disp_h2("edi1")
-        cfu.disp_array(self.edi1, ["u1", "v1"])
-        cfu.disp_h2("es2")
-        cfu.disp_array(self.es2, ["N", "Vy", "Mz"])
-        cfu.disp_h2("edi2")
-        cfu.disp_array(self.edi2, ["u1", "v1"])
-        cfu.disp_h2("es3")
-        cfu.disp_array(self.es3, ["N", "Vy", "Mz"])
-        cfu.disp_h2("edi3")
-        cfu.disp_array(self.edi3, ["u1", "v1"])
+        result = self.result
+
+        for i in range(3):
+            cfu.disp_h2(f"es{i + 1}")
+            cfu.disp_array(result.es[i], ["N", "Vy", "Mz"])
+            cfu.disp_h2(f"edi{i + 1}")
+            cfu.disp_array(result.edi[i], ["u1", "v1"])
+
+    def _diagram(self, name, title):
+        """Returns the persistent figure state of a diagram.
+
+        The figure is created on first use and kept in self.figures, so
+        later draws only update the data of its artists.
+        """
+
+        import calfem.vis_mpl as cfv
+
+        diagram = self.figures.get(name)
+
+        if diagram is None:
+            fig = cfv.figure()
+            ax = fig.add_subplot(111)
+            ax.set_title(title)
+            diagram = {"fig": fig, "ax": ax, "artists": None, "widget": None}
+            self.figures[name] = diagram
+
+        return diagram
+
+    def _scale_artists(self, ax):
+        """Creates the artists of a graphic scale (see cfv.scalgraph2)."""
+
+        lines = [ax.plot([], [], color=(0, 0, 1), linewidth=1)[0] for i in range(3)]
+        text = ax.text(0.0, 0.0, "")
+
+        return lines, text
+
+    def _update_scale(self, scale, sfac, magnitude):
+        """Updates a graphic scale in place."""
+
+        lines, text = scale
+        N, x, y = magnitude
+        L = N * sfac
+
+        lines[0].set_data([x, x + L], [y, y])
+        lines[1].set_data([x, x], [y - L / 20, y + L / 20])
+        lines[2].set_data([x + L, x + L], [y - L / 20, y + L / 20])
+        text.set_position((x + L * 1.1, y - L / 20))
+        text.set_text(str(N))
+
+    def _show_diagram(self, diagram, widget):
+        """Rescales the view to the data and schedules a redraw of a diagram."""
+
+        import calfem.vis_mpl as cfv
+
+        ax = diagram["ax"]
+        ax.relim()
+        ax.autoscale_view()
+        ax.axis("equal")
+        diagram["fig"].canvas.draw_idle()
+
+        if widget:
+            if diagram["widget"] is None:
+                diagram["widget"] = cfv.figure_widget(diagram["fig"])
+            return diagram["widget"]
+
+    def _draw_section_force(self, name, title, component, sfac_el, magnitude, widget):
+        """Draws a section force diagram for all beams (see cfv.secforce2)."""
+
+        import calfem.vis_mpl as cfv
+        from matplotlib.collections import LineCollection
+
+        ex = self.result.ex
+        ey = self.result.ey
+        es = self.result.es[:, :, component]
+
+        sfac = cfv.scalfact2(ex[sfac_el], ey[sfac_el], es[sfac_el], 0.2)
+
+        diagram = self._diagram(name, title)
+        ax = diagram["ax"]
+
+        if diagram["artists"] is None:
+            artists = {"diagrams": [], "stripes": [], "elements": []}
+            for i in range(3):
+                artists["diagrams"].append(ax.plot([], [], color=(0, 0, 1), linewidth=1)[0])
+                stripes = LineCollection([], colors=[(0, 0, 1)], linewidths=1)
+                ax.add_collection(stripes)
+                artists["stripes"].append(stripes)
+                artists["elements"].append(ax.plot([], [], color=(0, 0, 0), linewidth=2)[0])
+            artists["scale"] = self._scale_artists(ax)
+            diagram["artists"] = artists
+
+        artists = diagram["artists"]
+
+        for i in range(3):
+            x, y, stripes = _secforce_lines(ex[i], ey[i], es[i], sfac)
+            artists["diagrams"][i].set_data(x, y)
+            artists["stripes"][i].set_segments(stripes)
+            artists["elements"][i].set_data(ex[i], ey[i])
+
+        self._update_scale(artists["scale"], sfac, magnitude)
+
+        return self._show_diagram(diagram, widget)
 
     def draw_deformed(self, widget=False):
         """Draws the deformed model."""
 
-        if widget:
-            cfv.close(self.deformed_fig)
-
-        self.deformed_fig = cfv.figure()
-
-        plotpar = [2, 1, 0]
-        sfac = cfv.scalfact2(self.ex3, self.ey3, self.edi3, 0.1)
-        cfv.clf()
-        cfv.eldraw2(self.ex1, self.ey1, plotpar)
-        cfv.eldraw2(self.ex2, self.ey2, plotpar)
-        cfv.eldraw2(self.ex3, self.ey3, plotpar)
-
-        plotpar = [1, 2, 1]
-        cfv.dispbeam2(self.ex1, self.ey1, self.edi1, plotpar, sfac)
-        cfv.dispbeam2(self.ex2, self.ey2, self.edi2, plotpar, sfac)
-        cfv.dispbeam2(self.ex3, self.ey3, self.edi3, plotpar, sfac)
-        cfv.axis([-1.5, 7.5, -0.5, 5.5])
-        cfv.axis("equal")
-        plotpar1 = 2
-        cfv.scalgraph2(sfac, [1e-2, 0.5, 0], plotpar1)
-        cfv.title("Displacements")
+        import calfem.vis_mpl as cfv
 
-        if widget:
-            return cfv.figure_widget(self.deformed_fig)
+        ex = self.result.ex
+        ey = self.result.ey
+        edi = self.result.edi
 
-    def draw_normal_forces(self, widget=False):
-        """Draws the normal forces."""
+        sfac = cfv.scalfact2(ex[2], ey[2], edi[2], 0.1)
 
-        if widget:
-            cfv.close(self.normal_forces_fig)
+        diagram = self._diagram("deformed", "Displacements")
+        ax = diagram["ax"]
 
-        self.normal_forces_fig = cfv.figure(2)
+        if diagram["artists"] is None:
+            artists = {"undeformed": [], "deformed": []}
+            for i in range(3):
+                artists["undeformed"].append(ax.plot(
+                    [], [], color=(0, 0, 0), linestyle=(0, (5, 5)), linewidth=1)[0])
+                artists["deformed"].append(ax.plot(
+                    [], [], color=(0, 0, 1), linewidth=1, marker="o", markevery=[0, -1],
+                    markerfacecolor="none", markeredgecolor=(0, 0, 0))[0])
+            artists["scale"] = self._scale_artists(ax)
+            diagram["artists"] = artists
 
-        plotpar = [2, 1]
-        sfac = cfv.scalfact2(self.ex1, self.ey1, self.es1[:, 0], 0.2)
-        cfv.secforce2(self.ex1, self.ey1, self.es1[:, 0], plotpar, sfac)
-        cfv.secforce2(self.ex2, self.ey2, self.es2[:, 0], plotpar, sfac)
-        cfv.secforce2(self.ex3, self.ey3, self.es3[:, 0], plotpar, sfac)
-        cfv.axis([-1.5, 7.5, -0.5, 5.5])
-        cfv.axis("equal")
-        plotpar1 = 2
-        cfv.scalgraph2(sfac, [3e4, 1.5, 0], plotpar1)
-        cfv.title("Normal force")
+        artists = diagram["artists"]
 
-        if widget:
-            return cfv.figure_widget(self.normal_forces_fig)
+        for i in range(3):
+            artists["undeformed"][i].set_data(ex[i], ey[i])
+            artists["deformed"][i].set_data(*_dispbeam_line(ex[i], ey[i], edi[i], sfac))
 
-    def draw_shear_forces(self, widget=False):
-        """Draws the shear forces."""
+        self._update_scale(artists["scale"], sfac, [1e-2, 0.5, 0])
 
-        if widget:
-            cfv.close(self.shear_forces_fig)
+        return self._show_diagram(diagram, widget)
 
-        self.shear_forces_fig = cfv.figure(3)
+    def draw_normal_forces(self, widget=False):
+        """Draws the normal forces."""
 
-        plotpar = [2, 1]
-        sfac = cfv.scalfact2(self.ex3, self.ey3, self.es3[:, 1], 0.2)
-        cfv.secforce2(self.ex1, self.ey1, self.es1[:, 1], plotpar, sfac)
-        cfv.secforce2(self.ex2, self.ey2, self.es2[:, 1], plotpar, sfac)
-        cfv.secforce2(self.ex3, self.ey3, self.es3[:, 1], plotpar, sfac)
-        cfv.axis([-1.5, 7.5, -0.5, 5.5])
-        cfv.axis("equal")
-        plotpar1 = 2
-        cfv.scalgraph2(sfac, [3e4, 0.5, 0], plotpar1)
-        cfv.title("Shear force")
+        return self._draw_section_force(
+            "normal_forces", "Normal force", 0, 0, [3e4, 1.5, 0], widget)
 
-        if widget:
-            return cfv.figure_widget(self.shear_forces_fig)
+    def draw_shear_forces(self, widget=False):
+        """Draws the shear forces."""
+
+        return self._draw_section_force(
+            "shear_forces", "Shear force", 1, 2, [3e4, 0.5, 0], widget)
 
     def draw_moments(self, widget=False):
         """Draws the moments."""
 
-        if widget:
-            cfv.close(self.moments_fig)
-
-        self.moments_fig = cfv.figure(4)
-
-        plotpar = [2, 1]
-        sfac = cfv.scalfact2(self.ex3, self.ey3, self.es3[:, 2], 0.2)
-        cfv.secforce2(self.ex1, self.ey1, self.es1[:, 2], plotpar, sfac)
-        cfv.secforce2(self.ex2, self.ey2, self.es2[:, 2], plotpar, sfac)
-        cfv.secforce2(self.ex3, self.ey3, self.es3[:, 2], plotpar, sfac)
-        cfv.axis([-1.5, 7.5, -0.5, 5.5])
-        cfv.axis("equal")
-        plotpar1 = 2
-        cfv.scalgraph2(sfac, [3e4, 0.5, 0], plotpar1)
-        cfv.title("Moment")
-        
-        if widget:
-            return cfv.figure_widget(self.moments_fig)
+        return self._draw_section_force(
+            "moments", "Moment", 2, 2, [3e4, 0.5, 0], widget)
+
+    def draw_envelope(self, component=2, widget=False):
+        """Draws the max/min envelope of a section force.
+
+        component is 0 (normal force), 1 (shear force) or 2 (moment). The
+        max envelope is drawn in blue and the min envelope in red.
+        """
+
+        import calfem.vis_mpl as cfv
+        from matplotlib.collections import LineCollection
+
+        if self.envelope_results is None:
+            raise ValueError("No envelope computed, call envelope() first.")
+
+        if self.envelope_results["key"] != (self.stiffness_key(), self.nep):
+            raise ValueError("Envelope is out of date, call envelope() again.")
+
+        ex, ey, ep = self.element_arrays()
+        es = {
+            "max": self.envelope_results["max"][:, :, component],
+            "min": self.envelope_results["min"][:, :, component]
+        }
+        colors = {"max": (0, 0, 1), "min": (1, 0, 0)}
+
+        sfac = cfv.scalfact2(ex[2], ey[2], np.concatenate([es["max"], es["min"]]), 0.2)
+
+        diagram = self._diagram("envelope", "")
+        ax = diagram["ax"]
+
+        if diagram["artists"] is None:
+            artists = {"elements": []}
+            for bound, color in colors.items():
+                artists[bound] = []
+                artists[bound + "_stripes"] = []
+                for i in range(3):
+                    artists[bound].append(ax.plot([], [], color=color, linewidth=1)[0])
+                    stripes = LineCollection([], colors=[color], linewidths=1)
+                    ax.add_collection(stripes)
+                    artists[bound + "_stripes"].append(stripes)
+            for i in range(3):
+                artists["elements"].append(ax.plot([], [], color=(0, 0, 0), linewidth=2)[0])
+            artists["scale"] = self._scale_artists(ax)
+            diagram["artists"] = artists
+
+        artists = diagram["artists"]
+
+        for bound in colors:
+            for i in range(3):
+                x, y, stripes = _secforce_lines(ex[i], ey[i], es[bound][i], sfac)
+                artists[bound][i].set_data(x, y)
+                artists[bound + "_stripes"][i].set_segments(stripes)
+
+        for i in range(3):
+            artists["elements"][i].set_data(ex[i], ey[i])
+
+        self._update_scale(artists["scale"], sfac, [3e4, 0.5, 0])
+        ax.set_title(["Normal force", "Shear force", "Moment"][component] + " envelope")
+
+        return self._show_diagram(diagram, widget)
 
     def show_and_wait(self):
         """Shows the plots and waits for the user to close them."""
+
+        import calfem.vis_mpl as cfv
+
         cfv.show_and_wait()
 
 
 if __name__ == "__main__":
 
+    # ----- With arguments, run the headless batch solver ----------------
+
+    if len(sys.argv) > 1:
+        import frame_batch
+        sys.exit(frame_batch.main(sys.argv[1:]))
+
     model = FrameModel()
 
     model.w = 6.0
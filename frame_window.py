@@ -1,27 +1,106 @@
 # -*- coding: utf-8 -*-
 """Huvudmodul för programmet. Innehåller huvudfönsterklassen."""
 
+import time
+
+start_time = time.perf_counter()
+
 import frame_model as fm
-import frame_window_res
-import sys
+import frame_cache
+import sys, os, copy
+from collections import OrderedDict
 
-from qtpy.QtCore import QObject, Signal
-from qtpy.QtWidgets import QApplication, QMainWindow, QFileDialog, QPlainTextEdit, QLineEdit
+from concurrent.futures import ThreadPoolExecutor
+
+from qtpy.QtCore import QObject, Signal, QTimer, QResource
+from qtpy.QtWidgets import QApplication, QMainWindow, QFileDialog, QPlainTextEdit, QLineEdit, QProgressBar
+from qtpy.QtWidgets import QWidget, QVBoxLayout
 from qtpy.QtGui import QFont, QTextCursor
-from qtpy import uic
+
+def register_resources():
+    """Registrera ikoner och bilder
+
+    Den binära resursfilen frame_window_res.rcc (skapas med build.py)
+    registreras direkt från fil, Qt minnesmappar den om det går. Saknas
+    filen används modulen frame_window_res.py. Returnerar källan.
+    """
+
+    rcc_filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frame_window_res.rcc")
+
+    if os.path.exists(rcc_filename) and QResource.registerResource(rcc_filename):
+        return "frame_window_res.rcc"
+
+    import frame_window_res
+
+    return "frame_window_res.py"
+
+
+resource_source = register_resources()
+
+# --- Förkompilerat gränssnitt (skapas med build.py). Saknas modulen, eller
+# --- om FRAME_WINDOW_LOAD_UI är satt, läses frame_window.ui in vid start.
+
+try:
+    from frame_window_ui import Ui_MainWindow
+except ImportError:
+    Ui_MainWindow = object
 
 
 class Stream(QObject):
-    """Klass för att omdirigera stdout till textfält"""
+    """Klass för att omdirigera stdout till textfält
+
+    Texten samlas i en buffert och skickas med en signal en gång per varv
+    i händelseloopen, eller vid flush, i stället för vid varje write.
+    """
     newText = Signal(str)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.buffer = []
+        self.flush_pending = False
+
     def write(self, text):
-        self.newText.emit(str(text))
+        self.buffer.append(str(text))
+
+        if not self.flush_pending:
+            self.flush_pending = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        self.flush_pending = False
 
+        if self.buffer:
+            text = "".join(self.buffer)
+            self.buffer.clear()
+            self.newText.emit(text)
 
-class FrameWindow(QMainWindow):
+
+class FrameWindow(QMainWindow, Ui_MainWindow):
     """MainWindow-klass som hanterar vårt huvudfönster"""
 
+    # --- Signaler från beräkningstråden (levereras i GUI-tråden)
+
+    solve_finished = Signal(int, object)
+    solve_failed = Signal(int, str)
+
+    # --- Fördröjning i ms innan en ändring startar en beräkning
+
+    solve_delay = 150
+
+    # --- Antal tillstånd vars ritade diagram sparas för återanvändning
+
+    figure_cache_size = 4
+
+    # --- Diagramtabbar: ritmetod i modellen och tabbtitel
+
+    result_views = [
+        ("draw_deformed", "Displacements"),
+        ("draw_normal_forces", "Normal forces"),
+        ("draw_shear_forces", "Shear forces"),
+        ("draw_moments", "Moments")
+    ]
+
     def __init__(self, app):
         """Class constructor"""
 
@@ -31,9 +110,30 @@ class FrameWindow(QMainWindow):
 
         self.app = app
 
-        # --- Läs in gränssnitt från fil
-
-        uic.loadUi("frame_window.ui", self)
+        # --- Skapa gränssnitt från förkompilerad modul eller läs in från fil
+
+        if Ui_MainWindow is object or os.environ.get("FRAME_WINDOW_LOAD_UI"):
+            from qtpy import uic
+            uic.loadUi(os.path.join(os.path.dirname(os.path.abspath(__file__)), "frame_window.ui"), self)
+            self.ui_source = "frame_window.ui"
+        else:
+            self.setupUi(self)
+            self.ui_source = "frame_window_ui.py"
+
+        # --- Koppling mellan modellparametrar och edit-fält
+
+        self.param_edits = {
+            "w": self.w_edit,
+            "h": self.h_edit,
+            "E": self.E_edit,
+            "A1": self.A1_edit,
+            "A2": self.A2_edit,
+            "I1": self.I1_edit,
+            "I2": self.I2_edit,
+            "q3": self.q0_edit,
+            "f1": self.P_edit
+        }
+        self.control_texts = {}
 
         # --- Font för textfält
 
@@ -45,6 +145,37 @@ class FrameWindow(QMainWindow):
 
         sys.stdout = Stream(newText=self.on_update_text)
 
+        # --- Beräkningar körs i en bakgrundstråd. Varje begäran får ett
+        # --- jobbnummer och endast resultatet från det senaste visas.
+
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.solve_future = None
+        self.solve_job = 0
+
+        # --- Resultatcache på disk om FRAME_CACHE_DIR är satt
+
+        self.solve_cache = frame_cache.default_cache()
+
+        self.solve_timer = QTimer(self)
+        self.solve_timer.setSingleShot(True)
+        self.solve_timer.setInterval(self.solve_delay)
+        self.solve_timer.timeout.connect(self.start_solve)
+
+        self.solve_finished.connect(self.on_solve_finished)
+        self.solve_failed.connect(self.on_solve_failed)
+
+        # --- Upptagetindikator i statusfältet
+
+        self.busy_bar = QProgressBar(self)
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setMaximumWidth(120)
+        self.busy_bar.setVisible(False)
+        self.statusbar.addPermanentWidget(self.busy_bar)
+
+        # --- Skapa resultat tabbar en gång, diagrammen ritas vid behov
+
+        self.create_result_tabs()
+
         # --- Visa fönster
 
         self.show()
@@ -76,33 +207,120 @@ class FrameWindow(QMainWindow):
 
 
     def solve_model(self):
-        """Lös modellen"""
+        """Lös modellen
+
+        Beräkningen startas efter en kort fördröjning så att snabba
+        ändringar slås ihop till en beräkning. En pågående beräkning
+        avbryts inte, men dess resultat ignoreras om modellen hunnit
+        ändras.
+        """
 
         # --- Hämta värden från kontroller och uppdatera modellen
 
         self.update_model()
 
-        # --- Rensa resultat tabbar
+        # --- Nytt jobbnummer gör tidigare beräkningar inaktuella
 
-        self.remove_result_tabs()
+        self.solve_job += 1
 
-        # --- Skapa textfält för resultat
+        # --- Ett tidigare löst tillstånd visas direkt från cachen
 
-        self.output_text = QPlainTextEdit(self)
-        self.output_text.setFont(self.text_font)
-        self.main_tabs.addTab(self.output_text, "Results")
+        if self.model.has_cached_result():
+            self.solve_timer.stop()
+            self.model.solve()
+            self.model_solved = True
+            self.show_results()
+            self.set_busy(False)
+            return
 
-        # --- Lös modellen
+        self.set_busy(True)
+        self.solve_timer.start()
 
-        self.model.solve()
+    def start_solve(self):
+        """Skicka en kopia av modellen till beräkningstråden"""
 
-        # --- Skapa resultat tabbar för diagram
+        # --- Ta bort köad beräkning som inte hunnit starta
 
-        self.create_result_tabs()
+        if self.solve_future is not None:
+            self.solve_future.cancel()
+
+        # --- Kopian delar modellens resultat- och faktoriseringscache,
+        # --- cacherna är trådsäkra
+
+        model = copy.copy(self.model)
+        self.solve_future = self.executor.submit(self.run_solve, self.solve_job, model)
+
+    def run_solve(self, job, model):
+        """Lös modellen (körs i beräkningstråden)"""
+
+        try:
+            model.solve()
+        except Exception as e:
+            self.solve_failed.emit(job, str(e))
+        else:
+            self.solve_finished.emit(job, model)
+
+    def on_solve_finished(self, job, model):
+        """Visa resultat från beräkningstråden"""
+
+        # --- Inaktuellt resultat, en nyare beräkning är på väg
+
+        if job != self.solve_job:
+            return
+
+        # --- Behåll figurerna, de uppdateras på plats vid nästa ritning
+
+        model.figures = self.model.figures
+
+        self.model = model
+        self.model_solved = True
+        self.show_results()
+        self.set_busy(False)
+
+    def on_solve_failed(self, job, message):
+        """Visa felmeddelande från beräkningstråden"""
+
+        if job != self.solve_job:
+            return
+
+        self.set_busy(False)
+        self.statusbar.showMessage(f"Beräkningen misslyckades: {message}")
+
+    def set_busy(self, busy):
+        """Visa eller dölj upptagetindikatorn"""
+
+        self.busy_bar.setVisible(busy)
+
+        if busy:
+            self.statusbar.showMessage("Beräknar...")
+        else:
+            self.statusbar.clearMessage()
+
+    def show_results(self):
+        """Visa resultat för en löst modell"""
+
+        # --- Varje tillstånd har egna figurer. Ett tidigare visat
+        # --- tillstånd återanvänder sina redan ritade figurer, annars
+        # --- återanvänds figurerna från det äldsta tillståndet och
+        # --- diagrammen ritas om först när deras tabb visas.
+
+        key = self.model.state_key()
+        entry = self.figure_cache.pop(key, None)
+
+        if entry is None:
+            if len(self.figure_cache) >= self.figure_cache_size:
+                old_key, entry = self.figure_cache.popitem(last=False)
+                entry["tabs"].clear()
+            else:
+                entry = {"figures": {}, "tabs": {}}
+
+        self.figure_cache[key] = entry
+        self.model.figures = entry["figures"]
+        self.rendered_tabs = entry["tabs"]
 
         # --- Skriv ut resultat
 
-        self.model.print_results()
+        self.output_text.setPlainText(self.model.print_results(to_string=True))
 
         # --- Flytta text-markören till början av textfältet
 
@@ -111,14 +329,21 @@ class FrameWindow(QMainWindow):
         self.output_text.setTextCursor(cursor)
         self.output_text.ensureCursorVisible()
 
-        # --- Visa deformationstabben som default
+        # --- Visa deformationstabben som default första gången
 
-        self.main_tabs.setCurrentIndex(1)
+        if self.main_tabs.currentIndex() == 0 and not self.shown_results:
+            self.main_tabs.setCurrentIndex(1)
+        else:
+            self.render_tab(self.main_tabs.currentIndex())
+
+        self.shown_results = True
 
     def init_model(self):
         """Initiera modellen"""
 
         self.model = fm.FrameModel()
+        self.model.solve_cache = self.solve_cache
+        self.model_solved = False
 
         self.update_controls()
         self.solve_model()
@@ -126,15 +351,10 @@ class FrameWindow(QMainWindow):
     def update_controls(self):
         """Fyll kontrollerna med värden från modellen"""
 
-        self.w_edit.setText(f'{self.model.w:.3g}')
-        self.h_edit.setText(f'{self.model.h:.3g}')
-        self.E_edit.setText(f'{self.model.E:.3g}')
-        self.A1_edit.setText(f'{self.model.A1:.3g}')
-        self.A2_edit.setText(f'{self.model.A2:.3g}')
-        self.I1_edit.setText(f'{self.model.I1:.3g}')
-        self.I2_edit.setText(f'{self.model.I2:.3g}')
-        self.q0_edit.setText(f'{self.model.q3:.3g}')
-        self.P_edit.setText(f'{self.model.f1:.3g}')
+        for name, edit in self.param_edits.items():
+            text = f'{getattr(self.model, name):.3g}'
+            edit.setText(text)
+            self.control_texts[name] = text
 
     def try_float(self, text, default_value=0.0):
         """Konvertera text till float"""
@@ -145,32 +365,80 @@ class FrameWindow(QMainWindow):
             return default_value
 
     def update_model(self):
-        """Hämta värden från kontroller och uppdatera modellen"""
-
-        self.model.w = self.try_float(self.w_edit.text(), self.model.w)
-        self.model.h = self.try_float(self.h_edit.text(), self.model.h)
-        self.model.E = self.try_float(self.E_edit.text(), self.model.E)
-        self.model.A1 = self.try_float(self.A1_edit.text(), self.model.A1)
-        self.model.A2 = self.try_float(self.A2_edit.text(), self.model.A2)
-        self.model.I1 = self.try_float(self.I1_edit.text(), self.model.I1)
-        self.model.I2 = self.try_float(self.I2_edit.text(), self.model.I2)
-        self.model.q3 = self.try_float(self.q0_edit.text(), self.model.q3)
-        self.model.f1 = self.try_float(self.P_edit.text(), self.model.f1)
+        """Hämta värden från kontroller och uppdatera modellen
+
+        Returnerar en mängd med namnen på de parametrar som ändrats. Fält
+        vars text inte ändrats sedan update_controls lämnas orörda, så att
+        avrundningen i visningen inte ändrar modellen.
+        """
+
+        changed = set()
+
+        for name, edit in self.param_edits.items():
+            text = edit.text()
+            if text == self.control_texts.get(name):
+                continue
+
+            old_value = getattr(self.model, name)
+            value = self.try_float(text, old_value)
+            if value != old_value:
+                setattr(self.model, name, value)
+                changed.add(name)
 
         self.update_controls()
 
+        return changed
+
     def create_result_tabs(self):
         """Skapa result tabbar"""
 
-        self.main_tabs.addTab(self.model.draw_deformed(widget=True), "Displacements")
-        self.main_tabs.addTab(self.model.draw_normal_forces(widget=True), "Normal forces")
-        self.main_tabs.addTab(self.model.draw_shear_forces(widget=True), "Shear forces")
-        self.main_tabs.addTab(self.model.draw_moments(widget=True), "Moments")
-
-    def remove_result_tabs(self):
-        """Ta bort resultat tabbar"""
         self.main_tabs.clear()
 
+        # --- Textfält för resultat
+
+        self.output_text = QPlainTextEdit(self)
+        self.output_text.setFont(self.text_font)
+        self.main_tabs.addTab(self.output_text, "Results")
+
+        # --- Tomma sidor för diagrammen
+
+        for draw_name, title in self.result_views:
+            page = QWidget(self)
+            layout = QVBoxLayout(page)
+            layout.setContentsMargins(0, 0, 0, 0)
+            self.main_tabs.addTab(page, title)
+
+        self.rendered_tabs = {}
+        self.figure_cache = OrderedDict()
+        self.shown_results = False
+
+        self.main_tabs.currentChanged.connect(self.render_tab)
+
+    def render_tab(self, index):
+        """Visa tillståndets diagram i en tabb, rita det om det saknas"""
+
+        if index < 1 or not self.model_solved:
+            return
+
+        # --- Redan ritade diagram för tillståndet återanvänds
+
+        canvas = self.rendered_tabs.get(index)
+
+        if canvas is None:
+            draw_name, title = self.result_views[index - 1]
+            canvas = getattr(self.model, draw_name)(widget=True)
+            self.rendered_tabs[index] = canvas
+
+        # --- Byt widget om tabben visar ett annat tillstånds figur.
+        # --- Undanbytta widgets tas inte bort, de hör till figurcachen.
+
+        layout = self.main_tabs.widget(index).layout()
+
+        if layout.indexOf(canvas) < 0:
+            while layout.count() > 0:
+                layout.takeAt(0).widget().setParent(None)
+            layout.addWidget(canvas)
+
     def on_update_text(self, text):
         """Uppdatera text i status fältet"""
 
@@ -185,8 +453,12 @@ class FrameWindow(QMainWindow):
     def on_editing_finished(self):
         """Uppdatera modellen när en kontroll ändrats"""
 
-        self.update_model()
-        self.solve_model()
+        # --- editingFinished skickas även när fokus lämnar ett fält, lös
+        # --- bara om någon parameter faktiskt ändrats. Ändras endast
+        # --- lasterna återanvänder modellen sin faktorisering av K.
+
+        if self.update_model():
+            self.solve_model()
 
     def on_execute_action(self):
         """Kör beräkningen"""
@@ -205,15 +477,34 @@ class FrameWindow(QMainWindow):
         # --- Fråga efter filnamn
 
         new_filename, _ = QFileDialog.getOpenFileName(
-            self, "Öppna modell", "", "Modell filer (*.json *.jpg *.bmp)")
+            self, "Öppna modell", "", "Modell filer (*.json *.frm)")
 
         # --- Om filnamn finns, ladda modellen
 
         if new_filename != "":
+
+            # --- Felaktiga filer, t.ex. resultat från frame_batch,
+            # --- rapporteras i statusfältet och modellen behålls
+
+            try:
+                self.model.load(new_filename)
+            except (ValueError, KeyError, OSError) as e:
+                self.statusbar.showMessage(f"Kunde inte öppna {new_filename}: {e}")
+                return
+
             self.filename = new_filename
-            self.model.load(self.filename)
             self.update_controls()
-            self.solve_model()
+
+            # --- Binära filer innehåller resultat, lös bara om de saknas
+
+            if self.model.result is not None:
+                self.solve_timer.stop()
+                self.solve_job += 1
+                self.set_busy(False)
+                self.model_solved = True
+                self.show_results()
+            else:
+                self.solve_model()
 
     def on_save_action(self):
         """Spara modell"""
@@ -226,7 +517,7 @@ class FrameWindow(QMainWindow):
 
         if self.filename == "":
             new_filename, _ = QFileDialog.getSaveFileName(
-                self, "Spara modell", "", "Modell filer (*.json)")
+                self, "Spara modell", "", "Modell filer (*.json *.frm)")
 
         # --- Om filnamn finns, spara modellen
 
@@ -244,7 +535,7 @@ class FrameWindow(QMainWindow):
         # --- Fråga efter filnamn
 
         new_filename, _ = QFileDialog.getSaveFileName(
-            self, "Spara modell", "", "Modell filer (*.json)")
+            self, "Spara modell", "", "Modell filer (*.json *.frm)")
 
         # --- Om filnamn finns, spara modellen
 
@@ -257,6 +548,30 @@ class FrameWindow(QMainWindow):
 
         self.close()
 
+    def report_startup_time(self):
+        """Skriv ut tiden från programstart till första visade fönster"""
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Startup: {elapsed:.3f} s to first window "
+              f"(UI from {self.ui_source}, resources from {resource_source})", file=sys.stderr)
+
+        # --- Maximalt residentminne (ru_maxrss är i kB på Linux)
+
+        try:
+            import resource
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            print(f"Startup: max resident memory {max_rss / 1024:.1f} MB", file=sys.stderr)
+        except ImportError:
+            pass
+
+    def closeEvent(self, event):
+        """Stäng beräkningstråden när fönstret stängs"""
+
+        self.solve_timer.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        super().closeEvent(event)
+
 
 if __name__ == '__main__':
 
@@ -264,4 +579,8 @@ if __name__ == '__main__':
 
     window = FrameWindow(app)
 
+    # --- Rapportera starttid när händelseloopen har ritat fönstret
+
+    QTimer.singleShot(0, window.report_startup_time)
+
     sys.exit(app.exec_())
@@ -2,11 +2,11 @@
 
 # Resource object code
 #
-# Created by: The Resource Compiler for PyQt5 (Qt v5.15.2)
+# Created by: The Resource Compiler for PyQt5 (Qt v5.15.14)
 #
 # WARNING! All changes made in this file will be lost!
 
-from PyQt5 import QtCore
+from qtpy import QtCore
 
 qt_resource_data = b"\
 \x00\x00\x02\x7b\
@@ -1486,25 +1486,25 @@ qt_resource_struct_v2 = b"\
 \x00\x00\x00\x34\x00\x02\x00\x00\x00\x08\x00\x00\x00\x04\
 \x00\x00\x00\x00\x00\x00\x00\x00\
 \x00\x00\x00\x46\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\
-\x00\x00\x01\x86\xe5\x8c\x18\x85\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x00\x86\x00\x00\x00\x00\x00\x01\x00\x00\x02\x7f\
-\x00\x00\x01\x86\xe5\x8c\x18\x86\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x00\xb8\x00\x00\x00\x00\x00\x01\x00\x00\x05\x26\
-\x00\x00\x01\x86\xe5\x8c\x18\x85\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x00\xe8\x00\x00\x00\x00\x00\x01\x00\x00\x08\x31\
-\x00\x00\x01\x86\xe5\x8c\x18\x82\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x01\x1a\x00\x00\x00\x00\x00\x01\x00\x00\x0b\x0d\
-\x00\x00\x01\x86\xe5\x8c\x18\x83\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x01\x52\x00\x00\x00\x00\x00\x01\x00\x00\x0e\x21\
-\x00\x00\x01\x86\xe5\x8c\x18\x83\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x01\x7c\x00\x00\x00\x00\x00\x01\x00\x00\x0f\xcb\
-\x00\x00\x01\x86\xe5\x8c\x18\x84\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x01\xa6\x00\x00\x00\x00\x00\x01\x00\x00\x11\xaa\
-\x00\x00\x01\x86\xe5\x8c\x18\x83\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 \x00\x00\x00\x34\x00\x02\x00\x00\x00\x01\x00\x00\x00\x0d\
 \x00\x00\x00\x00\x00\x00\x00\x00\
 \x00\x00\x01\xe2\x00\x00\x00\x00\x00\x01\x00\x00\x13\xfb\
-\x00\x00\x01\x8d\xa8\x22\x3b\x3b\
+\x00\x00\x01\x8d\xb1\x25\xec\x08\
 "
 
 qt_version = [int(v) for v in QtCore.qVersion().split('.')]
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'frame_window.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from qtpy import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(1508, 1088)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.verticalLayout_3 = QtWidgets.QVBoxLayout(self.centralwidget)
+        self.verticalLayout_3.setContentsMargins(8, 8, 8, 8)
+        self.verticalLayout_3.setSpacing(7)
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.splitter = QtWidgets.QSplitter(self.centralwidget)
+        self.splitter.setOrientation(QtCore.Qt.Vertical)
+        self.splitter.setObjectName("splitter")
+        self.widget = QtWidgets.QWidget(self.splitter)
+        self.widget.setObjectName("widget")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.widget)
+        self.horizontalLayout.setContentsMargins(0, 0, 0, 0)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.label_4 = QtWidgets.QLabel(self.widget)
+        self.label_4.setBaseSize(QtCore.QSize(1, 0))
+        self.label_4.setText("")
+        self.label_4.setPixmap(QtGui.QPixmap(":/illustrations/images/frame.png"))
+        self.label_4.setScaledContents(False)
+        self.label_4.setObjectName("label_4")
+        self.horizontalLayout.addWidget(self.label_4)
+        self.tabWidget = QtWidgets.QTabWidget(self.widget)
+        self.tabWidget.setObjectName("tabWidget")
+        self.tab = QtWidgets.QWidget()
+        self.tab.setObjectName("tab")
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout(self.tab)
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.gridLayout_2 = QtWidgets.QGridLayout()
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.hLabel = QtWidgets.QLabel(self.tab)
+        self.hLabel.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.hLabel.setObjectName("hLabel")
+        self.gridLayout_2.addWidget(self.hLabel, 1, 0, 1, 1)
+        self.h_edit = QtWidgets.QLineEdit(self.tab)
+        self.h_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.h_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.h_edit.setObjectName("h_edit")
+        self.gridLayout_2.addWidget(self.h_edit, 1, 1, 1, 1)
+        self.w_edit = QtWidgets.QLineEdit(self.tab)
+        self.w_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.w_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.w_edit.setObjectName("w_edit")
+        self.gridLayout_2.addWidget(self.w_edit, 0, 1, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout_2.addItem(spacerItem, 0, 3, 1, 1)
+        self.wLabel = QtWidgets.QLabel(self.tab)
+        self.wLabel.setMinimumSize(QtCore.QSize(100, 0))
+        self.wLabel.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.wLabel.setObjectName("wLabel")
+        self.gridLayout_2.addWidget(self.wLabel, 0, 0, 1, 1)
+        self.label = QtWidgets.QLabel(self.tab)
+        self.label.setObjectName("label")
+        self.gridLayout_2.addWidget(self.label, 0, 2, 1, 1)
+        self.label_2 = QtWidgets.QLabel(self.tab)
+        self.label_2.setObjectName("label_2")
+        self.gridLayout_2.addWidget(self.label_2, 1, 2, 1, 1)
+        self.verticalLayout_2.addLayout(self.gridLayout_2)
+        spacerItem1 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout_2.addItem(spacerItem1)
+        self.tabWidget.addTab(self.tab, "")
+        self.tab_4 = QtWidgets.QWidget()
+        self.tab_4.setObjectName("tab_4")
+        self.verticalLayout = QtWidgets.QVBoxLayout(self.tab_4)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.gridLayout_3 = QtWidgets.QGridLayout()
+        self.gridLayout_3.setObjectName("gridLayout_3")
+        self.I1_label = QtWidgets.QLabel(self.tab_4)
+        self.I1_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.I1_label.setObjectName("I1_label")
+        self.gridLayout_3.addWidget(self.I1_label, 1, 0, 1, 1)
+        self.A1_edit = QtWidgets.QLineEdit(self.tab_4)
+        self.A1_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.A1_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.A1_edit.setObjectName("A1_edit")
+        self.gridLayout_3.addWidget(self.A1_edit, 0, 1, 1, 1)
+        self.E_label = QtWidgets.QLabel(self.tab_4)
+        self.E_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.E_label.setObjectName("E_label")
+        self.gridLayout_3.addWidget(self.E_label, 4, 0, 1, 1)
+        self.A2_edit = QtWidgets.QLineEdit(self.tab_4)
+        self.A2_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.A2_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.A2_edit.setObjectName("A2_edit")
+        self.gridLayout_3.addWidget(self.A2_edit, 2, 1, 1, 1)
+        self.A2_label = QtWidgets.QLabel(self.tab_4)
+        self.A2_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.A2_label.setObjectName("A2_label")
+        self.gridLayout_3.addWidget(self.A2_label, 2, 0, 1, 1)
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout_3.addItem(spacerItem2, 0, 3, 1, 1)
+        self.E_edit = QtWidgets.QLineEdit(self.tab_4)
+        self.E_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.E_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.E_edit.setObjectName("E_edit")
+        self.gridLayout_3.addWidget(self.E_edit, 4, 1, 1, 1)
+        self.I2_label = QtWidgets.QLabel(self.tab_4)
+        self.I2_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.I2_label.setObjectName("I2_label")
+        self.gridLayout_3.addWidget(self.I2_label, 3, 0, 1, 1)
+        self.A1_label = QtWidgets.QLabel(self.tab_4)
+        self.A1_label.setMinimumSize(QtCore.QSize(100, 0))
+        self.A1_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.A1_label.setObjectName("A1_label")
+        self.gridLayout_3.addWidget(self.A1_label, 0, 0, 1, 1)
+        self.I2_edit = QtWidgets.QLineEdit(self.tab_4)
+        self.I2_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.I2_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.I2_edit.setObjectName("I2_edit")
+        self.gridLayout_3.addWidget(self.I2_edit, 3, 1, 1, 1)
+        self.I1_edit = QtWidgets.QLineEdit(self.tab_4)
+        self.I1_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.I1_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.I1_edit.setObjectName("I1_edit")
+        self.gridLayout_3.addWidget(self.I1_edit, 1, 1, 1, 1)
+        self.label_3 = QtWidgets.QLabel(self.tab_4)
+        self.label_3.setObjectName("label_3")
+        self.gridLayout_3.addWidget(self.label_3, 0, 2, 1, 1)
+        self.label_5 = QtWidgets.QLabel(self.tab_4)
+        self.label_5.setObjectName("label_5")
+        self.gridLayout_3.addWidget(self.label_5, 1, 2, 1, 1)
+        self.label_6 = QtWidgets.QLabel(self.tab_4)
+        self.label_6.setObjectName("label_6")
+        self.gridLayout_3.addWidget(self.label_6, 2, 2, 1, 1)
+        self.label_7 = QtWidgets.QLabel(self.tab_4)
+        self.label_7.setObjectName("label_7")
+        self.gridLayout_3.addWidget(self.label_7, 3, 2, 1, 1)
+        self.label_8 = QtWidgets.QLabel(self.tab_4)
+        self.label_8.setObjectName("label_8")
+        self.gridLayout_3.addWidget(self.label_8, 4, 2, 1, 1)
+        self.verticalLayout.addLayout(self.gridLayout_3)
+        spacerItem3 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout.addItem(spacerItem3)
+        self.tabWidget.addTab(self.tab_4, "")
+        self.tab_2 = QtWidgets.QWidget()
+        self.tab_2.setObjectName("tab_2")
+        self.verticalLayout_4 = QtWidgets.QVBoxLayout(self.tab_2)
+        self.verticalLayout_4.setObjectName("verticalLayout_4")
+        self.gridLayout = QtWidgets.QGridLayout()
+        self.gridLayout.setObjectName("gridLayout")
+        self.q0_edit = QtWidgets.QLineEdit(self.tab_2)
+        self.q0_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.q0_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.q0_edit.setObjectName("q0_edit")
+        self.gridLayout.addWidget(self.q0_edit, 0, 1, 1, 1)
+        self.dLabel = QtWidgets.QLabel(self.tab_2)
+        self.dLabel.setMinimumSize(QtCore.QSize(100, 0))
+        self.dLabel.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.dLabel.setObjectName("dLabel")
+        self.gridLayout.addWidget(self.dLabel, 0, 0, 1, 1)
+        self.tLabel = QtWidgets.QLabel(self.tab_2)
+        self.tLabel.setMinimumSize(QtCore.QSize(100, 0))
+        self.tLabel.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.tLabel.setObjectName("tLabel")
+        self.gridLayout.addWidget(self.tLabel, 1, 0, 1, 1)
+        self.P_edit = QtWidgets.QLineEdit(self.tab_2)
+        self.P_edit.setMinimumSize(QtCore.QSize(100, 0))
+        self.P_edit.setMaximumSize(QtCore.QSize(60, 16777215))
+        self.P_edit.setObjectName("P_edit")
+        self.gridLayout.addWidget(self.P_edit, 1, 1, 1, 1)
+        spacerItem4 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.gridLayout.addItem(spacerItem4, 0, 3, 1, 1)
+        self.label_9 = QtWidgets.QLabel(self.tab_2)
+        self.label_9.setObjectName("label_9")
+        self.gridLayout.addWidget(self.label_9, 0, 2, 1, 1)
+        self.label_10 = QtWidgets.QLabel(self.tab_2)
+        self.label_10.setObjectName("label_10")
+        self.gridLayout.addWidget(self.label_10, 1, 2, 1, 1)
+        self.verticalLayout_4.addLayout(self.gridLayout)
+        spacerItem5 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout_4.addItem(spacerItem5)
+        self.tabWidget.addTab(self.tab_2, "")
+        self.horizontalLayout.addWidget(self.tabWidget)
+        self.main_tabs = QtWidgets.QTabWidget(self.splitter)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Maximum)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(2)
+        sizePolicy.setHeightForWidth(self.main_tabs.sizePolicy().hasHeightForWidth())
+        self.main_tabs.setSizePolicy(sizePolicy)
+        self.main_tabs.setAutoFillBackground(False)
+        self.main_tabs.setTabPosition(QtWidgets.QTabWidget.South)
+        self.main_tabs.setTabShape(QtWidgets.QTabWidget.Rounded)
+        self.main_tabs.setObjectName("main_tabs")
+        self.tab_3 = QtWidgets.QWidget()
+        self.tab_3.setObjectName("tab_3")
+        self.verticalLayout_5 = QtWidgets.QVBoxLayout(self.tab_3)
+        self.verticalLayout_5.setObjectName("verticalLayout_5")
+        self.output_text = QtWidgets.QTextEdit(self.tab_3)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.output_text.sizePolicy().hasHeightForWidth())
+        self.output_text.setSizePolicy(sizePolicy)
+        font = QtGui.QFont()
+        font.setFamily("Courier New")
+        self.output_text.setFont(font)
+        self.output_text.setObjectName("output_text")
+        self.verticalLayout_5.addWidget(self.output_text)
+        self.main_tabs.addTab(self.tab_3, "")
+        self.verticalLayout_3.addWidget(self.splitter)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 1508, 21))
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuCalculation = QtWidgets.QMenu(self.menubar)
+        self.menuCalculation.setObjectName("menuCalculation")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.toolBar = QtWidgets.QToolBar(MainWindow)
+        self.toolBar.setObjectName("toolBar")
+        MainWindow.addToolBar(QtCore.Qt.TopToolBarArea, self.toolBar)
+        self.new_action = QtWidgets.QAction(MainWindow)
+        icon = QtGui.QIcon()
+        icon.addPixmap(QtGui.QPixmap(":/toolbar/images/icons8-new-file-50.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        self.new_action.setIcon(icon)
+        self.new_action.setObjectName("new_action")
+        self.open_action = QtWidgets.QAction(MainWindow)
+        icon1 = QtGui.QIcon()
+        icon1.addPixmap(QtGui.QPixmap(":/toolbar/images/icons8-open-document-50.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        self.open_action.setIcon(icon1)
+        self.open_action.setObjectName("open_action")
+        self.save_action = QtWidgets.QAction(MainWindow)
+        icon2 = QtGui.QIcon()
+        icon2.addPixmap(QtGui.QPixmap(":/toolbar/images/icons8-upload-document-50.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        self.save_action.setIcon(icon2)
+        self.save_action.setObjectName("save_action")
+        self.save_as_action = QtWidgets.QAction(MainWindow)
+        self.save_as_action.setObjectName("save_as_action")
+        self.exit_action = QtWidgets.QAction(MainWindow)
+        self.exit_action.setObjectName("exit_action")
+        self.execute_action = QtWidgets.QAction(MainWindow)
+        icon3 = QtGui.QIcon()
+        icon3.addPixmap(QtGui.QPixmap(":/toolbar/images/icons8-play-50.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        self.execute_action.setIcon(icon3)
+        self.execute_action.setObjectName("execute_action")
+        self.exec_param_study_action = QtWidgets.QAction(MainWindow)
+        icon4 = QtGui.QIcon()
+        icon4.addPixmap(QtGui.QPixmap(":/toolbar/images/icons8-variable-50.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        self.exec_param_study_action.setIcon(icon4)
+        self.exec_param_study_action.setObjectName("exec_param_study_action")
+        self.menuFile.addAction(self.new_action)
+        self.menuFile.addAction(self.open_action)
+        self.menuFile.addAction(self.save_action)
+        self.menuFile.addAction(self.save_as_action)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.exit_action)
+        self.menuCalculation.addAction(self.execute_action)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuCalculation.menuAction())
+        self.toolBar.addAction(self.new_action)
+        self.toolBar.addAction(self.open_action)
+        self.toolBar.addAction(self.save_action)
+        self.toolBar.addSeparator()
+        self.toolBar.addAction(self.execute_action)
+        self.toolBar.addAction(self.exec_param_study_action)
+
+        self.retranslateUi(MainWindow)
+        self.tabWidget.setCurrentIndex(0)
+        self.main_tabs.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "Ground Water Flow 1.0"))
+        self.hLabel.setText(_translate("MainWindow", "h"))
+        self.wLabel.setText(_translate("MainWindow", "w"))
+        self.label.setText(_translate("MainWindow", "(m)"))
+        self.label_2.setText(_translate("MainWindow", "(m)"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), _translate("MainWindow", "Geometri"))
+        self.I1_label.setText(_translate("MainWindow", "I1"))
+        self.E_label.setText(_translate("MainWindow", "E"))
+        self.A2_label.setText(_translate("MainWindow", "A2"))
+        self.I2_label.setText(_translate("MainWindow", "I2"))
+        self.A1_label.setText(_translate("MainWindow", "A1"))
+        self.label_3.setText(_translate("MainWindow", "(m2)"))
+        self.label_5.setText(_translate("MainWindow", "(m3)"))
+        self.label_6.setText(_translate("MainWindow", "(m2)"))
+        self.label_7.setText(_translate("MainWindow", "(m3)"))
+        self.label_8.setText(_translate("MainWindow", "(Pa)"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_4), _translate("MainWindow", "Material"))
+        self.dLabel.setText(_translate("MainWindow", "q0"))
+        self.tLabel.setText(_translate("MainWindow", "P"))
+        self.label_9.setText(_translate("MainWindow", "(N/m)"))
+        self.label_10.setText(_translate("MainWindow", "(N)"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_2), _translate("MainWindow", "Last"))
+        self.main_tabs.setTabText(self.main_tabs.indexOf(self.tab_3), _translate("MainWindow", "Utskrift"))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuCalculation.setTitle(_translate("MainWindow", "Calculation"))
+        self.toolBar.setWindowTitle(_translate("MainWindow", "toolBar"))
+        self.new_action.setText(_translate("MainWindow", "New"))
+        self.open_action.setText(_translate("MainWindow", "Open..."))
+        self.save_action.setText(_translate("MainWindow", "Save"))
+        self.save_as_action.setText(_translate("MainWindow", "Save as..."))
+        self.exit_action.setText(_translate("MainWindow", "Exit"))
+        self.execute_action.setText(_translate("MainWindow", "Execute..."))
+        self.exec_param_study_action.setText(_translate("MainWindow", "Exec param study"))